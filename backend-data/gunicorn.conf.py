@@ -0,0 +1,74 @@
+import os
+import signal
+import threading
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wherehouse.settings')
+django.setup()
+
+from django.conf import settings
+
+bind = settings.SERVER_BIND
+workers = settings.SERVER_WORKERS
+if settings.SERVER_ASGI:
+    wsgi_app = 'wherehouse.asgi:application'
+    worker_class = 'uvicorn.workers.UvicornWorker'
+else:
+    wsgi_app = 'wherehouse.wsgi:application'
+    worker_class = 'gthread'
+    threads = settings.SERVER_THREADS
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = max_requests // 10
+preload_app = settings.SERVER_PRELOAD
+accesslog = '-'
+
+
+def _warmUp(server, force=False):
+    from recommend.recom.warmup import closeConnections, pauseRefresh, warmUp
+    # 마스터는 요청을 받지 않으므로 새로 고침 스레드 없이 만들기만 한다 (워커는 post_fork 에서 다시 켠다)
+    pauseRefresh()
+    start = time.time()
+    try:
+        warmUp(force)
+        server.log.info('Models loaded in %.1fs', time.time() - start)
+    except Exception:
+        # 실패해도 워커는 띄운다 (요청이 들어오면 각자 올린다)
+        server.log.exception('Model warm-up failed')
+    finally:
+        closeConnections()
+
+
+_watching = False
+
+def _watchReloadFile(server, path):
+    # 새 모델 데이터가 들어왔다는 표시 파일이 바뀌면 마스터에 SIGHUP
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    while True:
+        time.sleep(5)
+        current = os.path.getmtime(path) if os.path.exists(path) else None
+        if current != mtime:
+            mtime = current
+            server.log.info('%s changed, reloading', path)
+            os.kill(os.getpid(), signal.SIGHUP)
+
+
+def when_ready(server):
+    global _watching
+    if preload_app:
+        _warmUp(server)
+    if settings.SERVER_RELOAD_FILE and not _watching:
+        _watching = True
+        threading.Thread(target=_watchReloadFile, args=(server, settings.SERVER_RELOAD_FILE), daemon=True).start()
+
+def on_reload(server):
+    # SIGHUP: 마스터에서 모델을 새로 만든 뒤 새 워커를 띄우고, 기존 워커는 처리 중인 요청을 마치고 내려간다
+    if preload_app:
+        _warmUp(server, force=True)
+
+def post_fork(server, worker):
+    from recommend.recom.warmup import afterFork
+    afterFork()
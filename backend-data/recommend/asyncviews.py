@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.http import HttpResponseNotAllowed
+
+from recommend.recom.coldstart import getAztiRecommendations
+from recommend.recom.curated import curatedPayload
+from recommend.recom.response import jsonResponse, payloadResponse
+from recommend.recom.sampler import randomRestos
+from recommend.views import CbfList, cfRecomm, likedCount, locationQuery, mfRestos, mixRestoList, readyCheck, thirtyRestos
+
+# DB 쿼리(pymysql)와 모델 계산은 이벤트 루프를 막지 않도록 스레드 풀에서 돌린다.
+# 커넥션 풀보다 많이 두면 풀 대기만 늘어난다
+executor = ThreadPoolExecutor(max_workers=int(os.environ.get('RECOMMEND_ASYNC_WORKERS', os.environ.get('DB_POOL_SIZE', 10))), thread_name_prefix='recommend')
+
+async def offload(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args, **kwargs))
+
+def asyncApiView(methods):
+    # api_view 처럼 허용 메서드 검사 + CSRF 제외 (Django 4.1 의 데코레이터는 async 뷰를 감싸지 못한다)
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        wrapper.csrf_exempt = True
+        return wrapper
+    return decorator
+
+def requestData(request):
+    # api_view 의 request.data 대신 (JSON 또는 form)
+    if request.content_type == 'application/json':
+        return json.loads(request.body or b'{}')
+    return request.POST
+
+
+@asyncApiView(['GET'])
+async def recommCbfList(request, aztiType):
+    result = await offload(lambda: getAztiRecommendations().getCbf(aztiType))
+    data = {
+        'recommendCbfList': result,
+    }
+    return jsonResponse(data, request)
+
+@asyncApiView(['GET'])
+async def recommCfList(request, restoId):
+    data = {
+        'recommendCfList': await offload(cfRecomm, restoId)
+    }
+    return jsonResponse(data, request)
+
+@asyncApiView(['GET'])
+async def recommMfList(request, userId):
+    data = {
+        'recommendMfList': await offload(mfRestos, userId)
+    }
+    return jsonResponse(data, request)
+
+@asyncApiView(['GET'])
+async def restoList(request, userId, aztiType):
+    # 서로 관계없는 조회를 동시에 한다. MF 는 좋아요 수를 기다리지 않고 같이 시작하고,
+    # 좋아요가 없는 사용자면 결과를 버린다
+    liked_num, result_mf, result_cbf, result_random = await asyncio.gather(
+        offload(likedCount, userId),
+        offload(mfRestos, userId),
+        offload(CbfList, aztiType),
+        offload(randomRestos, 2, seed=request.GET.get('seed')),
+    )
+    if liked_num == 0:
+        result_mf = []
+
+    answer = await offload(mixRestoList, liked_num, result_cbf, result_mf, result_random)
+
+    data = {
+        'recomList': answer
+    }
+    return jsonResponse(data, request)
+
+@asyncApiView(['GET'])
+async def developerList(request):
+    return payloadResponse(await offload(curatedPayload, 'devList'), request)
+
+@asyncApiView(['GET'])
+async def youtuberList(request):
+    return payloadResponse(await offload(curatedPayload, 'youList'), request)
+
+@asyncApiView(['GET'])
+async def thirtyList(request):
+    data = {
+        'thirList': await offload(thirtyRestos, request.GET.get('seed'))
+    }
+    return jsonResponse(data, request)
+
+@asyncApiView(['GET'])
+async def likedList(request):
+    return payloadResponse(await offload(curatedPayload, 'likeList'), request)
+
+@asyncApiView(['GET'])
+async def trendingList(request):
+    return payloadResponse(await offload(curatedPayload, 'trendList'), request)
+
+@asyncApiView(['POST'])
+async def locationList(request):
+    return jsonResponse(await offload(locationQuery, requestData(request)), request)
+
+@asyncApiView(['GET'])
+async def readyList(request):
+    data, status = readyCheck()
+    return jsonResponse(data, request, status)
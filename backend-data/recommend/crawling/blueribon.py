@@ -2,6 +2,10 @@
 from tempfile import TemporaryFile
 import requests, json
 from bs4 import BeautifulSoup as bs
+from geocode import Geocoder
+# 증분 크롤링 (python blueribon.py --incremental)
+from changeset import emitChangeset, freshIds
+import sys
 
 # 셀레니움 기본 설정
 from selenium import webdriver
@@ -100,6 +104,8 @@ restro_data_id_list = ['28167', '1534', '30639', '28946', '1521', '198', '29567'
 
 # #1주소에서 data-id 값을 추출해서 리스트화 하고 #3에 값을 넣어가면서 원하는 데이터 추출하는 과정
 name = []
+# 블루리본 레스토랑 id (changeset 용, csv 에는 넣지 않는다)
+source_id = []
 # hours = []
 # menu = []
 menu1 = []
@@ -125,7 +131,15 @@ quiet = []
 real_local = []
 etc = []
 
+# 증분 모드면 최근에 받은 레스토랑은 페이지를 다시 받지 않는다 (RECHECK_AFTER 가 지나면 다시 받음)
+incremental = '--incremental' in sys.argv
+fresh_ids = freshIds('bluer') if incremental else set()
+unchanged = []
+
 for restro_code in restro_data_id_list:
+    if restro_code in fresh_ids:
+        unchanged.append(restro_code)
+        continue
     blue_url = f"https://www.bluer.co.kr/restaurants/{restro_code}"
     page = requests.get(blue_url)
     soup = bs(page.text, "lxml")
@@ -147,7 +161,7 @@ for restro_code in restro_data_id_list:
     try:
         restro_address = soup.find('dl', attrs={"class": "dl-horizontal"}).findAll('dd')[1].get_text()
     except:
-        retsro_address = ''
+        restro_address = ''
 
     try:
         restro_tag_key = soup.find('div', attrs={"class": "col-md-6 padding-lg-left border-left-lg"}).findAll('dt')
@@ -177,25 +191,6 @@ for restro_code in restro_data_id_list:
     except:
         restro_menu2 = ''
 
-    def get_location(address):
-        url = 'https://dapi.kakao.com/v2/local/search/address.json?query=' + address
-        # 'KaKaoAK '는 그대로 두시고 개인키만 지우고 입력해 주세요.
-        # ex) KakaoAK 6af8d4826f0e56c54bc794fa8a294
-        headers = {"Authorization": "KakaoAK dca00a6145957259d9c0b9b788ecb425"}
-        api_json = json.loads(str(requests.get(url,headers=headers).text))
-        try:
-            address = api_json['documents'][0]['address']
-            crd = {"lat": str(address['y']), "lng": str(address['x'])}
-        except:
-            crd = {"lat": 'not found', "lng": 'not found'}
-        return crd
-
-    crd = get_location(restro_address)
-
-    restro_location_y = crd["lat"]
-    restro_location_x = crd["lng"]
-
-
     for i in range(len(restro_tag_key)):
         try:
             key = restro_tag_key[i].get_text()
@@ -232,14 +227,13 @@ for restro_code in restro_data_id_list:
         pass
     
     name.append(restro_name)
+    source_id.append(restro_code)
     menu1.append(restro_menu1)
     menu2.append(restro_menu2)
     tag.append(restro_tag_str)
     address.append(restro_address)
     number.append(restro_number)
     thumbnail.append(restro_thumbnail)
-    location_x.append(restro_location_x)
-    location_y.append(restro_location_y)
     resto_age.append(restro_age)
     sectors.append(restro_sectors)
 
@@ -256,6 +250,12 @@ for restro_code in restro_data_id_list:
     real_local.append('')
     etc.append('')
 
+# 좌표는 캐시에 없는 주소만 한꺼번에 물어본다
+crds = Geocoder().resolveMany(address)
+for restro_address in address:
+    location_y.append(crds[restro_address]["lat"])
+    location_x.append(crds[restro_address]["lng"])
+
 blue_restro_df = pd.DataFrame()
 blue_restro_df['resto_age'] = resto_age
 blue_restro_df['thumbnail'] = thumbnail
@@ -281,4 +281,7 @@ blue_restro_df['quiet'] = quiet
 blue_restro_df['real_local'] = real_local
 blue_restro_df['etc'] = etc
 
-blue_restro_df.to_csv("blue_restro_df.csv", mode='w', encoding='utf8')
+if incremental:
+    emitChangeset('bluer', source_id, blue_restro_df, 'blue_restro_changes.json', unchanged)
+else:
+    blue_restro_df.to_csv("blue_restro_df.csv", mode='w', encoding='utf8')
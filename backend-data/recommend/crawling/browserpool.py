@@ -0,0 +1,169 @@
+# 크롤러 공용 셀레니움 워커 풀. 헤드리스 크롬 여러 개가 구/검색어 같은 작업을 나눠 처리한다
+import functools
+import logging
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+
+# 크롬 드라이버 자동 업데이트
+from webdriver_manager.chrome import ChromeDriverManager
+
+logger = logging.getLogger(__name__)
+
+# 목록 크롤링에는 필요 없는 이미지/폰트 요청은 막는다 (img 의 src 속성은 그대로 읽힌다)
+BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot']
+
+@functools.lru_cache(maxsize=None)
+def driverPath():
+    # 크롬 드라이버 설치는 워커마다가 아니라 한 번만
+    return ChromeDriverManager().install()
+
+def chromeOptions(headless=True, block_resources=True):
+    options = Options()
+    if headless:
+        options.add_argument('--headless')
+        # 헤드리스 기본 창은 작아서 반응형 레이아웃이 바뀌므로 maximize_window 대신 크기를 정해 둔다
+        options.add_argument('--window-size=1920,1080')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-dev-shm-usage')
+    # 불필요한 에러 메세지 없애기
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    if block_resources:
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return options
+
+def makeChrome(headless=True, block_resources=True):
+    service = Service(executable_path=driverPath())
+    driver = webdriver.Chrome(service=service, options=chromeOptions(headless, block_resources))
+    if block_resources:
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URLS})
+        except WebDriverException as e:
+            logger.warning('resource blocking unavailable: %s', e)
+    return driver
+
+
+def waitFor(driver, condition, timeout=10, poll=0.2, required=False):
+    # 조건이 맞으면 그 값, timeout 안에 맞지 않으면 None (required 면 TimeoutException -> 풀에서 다시 시도)
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=poll).until(condition)
+    except TimeoutException:
+        if required:
+            raise
+        return None
+
+def countOf(driver, selector):
+    return len(driver.find_elements(By.CSS_SELECTOR, selector))
+
+def clickMore(selector):
+    # '더보기' 버튼이 보이면 누른다. 없으면 False (목록 끝)
+    def advance(driver):
+        buttons = driver.find_elements(By.CSS_SELECTOR, selector)
+        if not buttons or not buttons[0].is_displayed():
+            return False
+        # 헤드리스에서는 버튼이 다른 요소에 가려 click() 이 실패할 때가 있어 스크립트로 누른다
+        driver.execute_script("arguments[0].click();", buttons[0])
+        return True
+    return advance
+
+def pressEnd(driver):
+    # 맨 아래로 스크롤 내린다
+    driver.find_element(By.CSS_SELECTOR, "body").send_keys(Keys.END)
+    return True
+
+def loadAll(driver, selector, advance, timeout=10, grow_timeout=5, max_rounds=500, required=False):
+    # advance 를 부를 때마다 selector 개수가 늘어날 때까지만 기다린다. 더 늘지 않으면 끝.
+    # 처음부터 하나도 안 뜨면 [] (required 면 빈 결과가 아니라 실패로 보고 TimeoutException)
+    if not waitFor(driver, lambda d: countOf(d, selector) > 0, timeout, required=required):
+        return []
+    count = countOf(driver, selector)
+    for _ in range(max_rounds):
+        if advance(driver) is False:
+            break
+        if not waitFor(driver, lambda d: countOf(d, selector) > count, grow_timeout):
+            break
+        count = countOf(driver, selector)
+    return driver.find_elements(By.CSS_SELECTOR, selector)
+
+
+class BrowserPool:
+    # 드라이버는 워커 수만큼만 만들어 두고 작업마다 놀고 있는 것을 빌려준다.
+    # task(driver, item) 이 WebDriverException 을 내면 그 드라이버는 버리고 새 드라이버로 다시 시도
+    def __init__(self, max_workers=None, factory=None, retries=1):
+        self.max_workers = max_workers or int(os.environ.get('CRAWL_BROWSERS', 4))
+        self.factory = factory or makeChrome
+        self.retries = retries
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            driver = self.factory()
+            with self._lock:
+                self._drivers.append(driver)
+            return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def run(self, task, item):
+        for attempt in range(self.retries + 1):
+            driver = self._acquire()
+            try:
+                result = task(driver, item)
+            except WebDriverException as e:
+                logger.warning('%s failed: %s', item, e)
+                self._discard(driver)
+                if attempt == self.retries:
+                    raise
+                continue
+            self._idle.put(driver)
+            return result
+
+    def runOrNone(self, task, item):
+        # 다시 시도해도 안 되면 None. 항목 하나 때문에 나머지 결과까지 버리지 않게
+        try:
+            return self.run(task, item)
+        except WebDriverException:
+            logger.exception('%s gave up', item)
+            return None
+
+    def map(self, task, items, skip_failed=False):
+        # 결과는 items 순서대로. skip_failed 면 실패한 항목 자리는 None
+        run = self.runOrNone if skip_failed else self.run
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            return list(pool.map(functools.partial(run, task), items))
+
+    def close(self):
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,128 @@
+# 증분 크롤링: 출처(source) + 원본 id 별 지문을 저장해 두고 바뀐 레코드만 changeset 으로 내보낸다
+import hashlib
+import json
+import sqlite3
+import time
+
+# 증분 모드에서 페이지를 다시 받지 않고 건너뛰는 기간 (조건부 요청이 안 되는 출처용). 지나면 다시 받아 내용 해시로 비교
+RECHECK_AFTER = 7 * 24 * 60 * 60
+
+def recordDigest(record):
+    # 파싱한 레코드의 내용 해시 (키 순서와 무관)
+    body = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def frameRecords(ids, frame):
+    # DataFrame 행 -> {원본 id: dict}. numpy 값은 JSON 으로 한 번 거쳐 파이썬 값으로
+    rows = json.loads(frame.to_json(orient='records', force_ascii=False))
+    return {str(source_id): row for source_id, row in zip(ids, rows)}
+
+
+class FingerprintStore:
+    def __init__(self, path='crawl_state.sqlite3'):
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS fingerprint (source TEXT NOT NULL, source_id TEXT NOT NULL, digest TEXT, etag TEXT, last_modified TEXT, fetched_at REAL NOT NULL, record TEXT, PRIMARY KEY (source, source_id))"""
+        )
+        self._connection.commit()
+
+    def fingerprints(self, source):
+        rows = self._connection.execute("""SELECT source_id, digest FROM fingerprint WHERE source = ?""", (source,)).fetchall()
+        return dict(rows)
+
+    def records(self, source):
+        # 지난번에 저장한 {원본 id: 레코드} (페이지를 건너뛸 때 그 페이지에서 읽던 값을 채우는 용도)
+        rows = self._connection.execute("""SELECT source_id, record FROM fingerprint WHERE source = ? AND record IS NOT NULL""", (source,)).fetchall()
+        return {source_id: json.loads(record) for source_id, record in rows}
+
+    def fresh(self, source, max_age=RECHECK_AFTER):
+        # max_age 안에 실제로 받아서 지문을 남긴 id (증분 모드에서 건너뛸 페이지)
+        rows = self._connection.execute(
+            """SELECT source_id FROM fingerprint WHERE source = ? AND fetched_at >= ?""", (source, time.time() - max_age)
+        ).fetchall()
+        return {source_id for source_id, in rows}
+
+    def validators(self, source):
+        # 조건부 요청용 {원본 id: (ETag, Last-Modified)}
+        rows = self._connection.execute(
+            """SELECT source_id, etag, last_modified FROM fingerprint WHERE source = ? AND (etag IS NOT NULL OR last_modified IS NOT NULL)""", (source,)
+        ).fetchall()
+        return {source_id: (etag, last_modified) for source_id, etag, last_modified in rows}
+
+    def diff(self, source, records, unchanged=(), complete=True):
+        # records: 이번에 받은 {원본 id: 레코드}, unchanged: 304 처럼 받지 않았지만 그대로인 id.
+        # complete 면 이번에 보지 못한 예전 id 는 삭제로 본다
+        previous = self.fingerprints(source)
+        changes = {'source': source, 'inserted': [], 'updated': [], 'deleted': []}
+        digests = {}
+        for source_id, record in records.items():
+            source_id = str(source_id)
+            digest = digests[source_id] = recordDigest(record)
+            if source_id not in previous:
+                changes['inserted'].append({'source_id': source_id, 'record': record})
+            elif previous[source_id] != digest:
+                changes['updated'].append({'source_id': source_id, 'record': record})
+        if complete:
+            seen = set(digests) | {str(source_id) for source_id in unchanged}
+            changes['deleted'] = sorted(source_id for source_id in previous if source_id not in seen)
+        return changes, digests
+
+    def commit(self, source, changes, digests, validators=None, records=None, cached=()):
+        # diff 결과를 저장 (받은 id 는 지문과 fetched_at 갱신, 삭제된 id 는 지운다. 304/건너뛴 id 는 그대로).
+        # cached = 페이지는 건너뛰고 지난 레코드 값으로 채운 id. 지문은 갱신하지만 fetched_at 은 그대로 둬서 RECHECK_AFTER 가 지나면 다시 받는다
+        now = time.time()
+        validators = validators or {}
+        records = records or {}
+        cached = {str(source_id) for source_id in cached}
+        fetched_at = {}
+        if cached:
+            fetched_at = dict(self._connection.execute("""SELECT source_id, fetched_at FROM fingerprint WHERE source = ?""", (source,)).fetchall())
+        rows = []
+        for source_id, digest in digests.items():
+            record = records.get(source_id)
+            record = None if record is None else json.dumps(record, ensure_ascii=False, default=str)
+            at = fetched_at.get(source_id, now) if source_id in cached else now
+            rows.append((source, source_id, digest, *validators.get(source_id, (None, None)), at, record))
+        with self._connection:
+            self._connection.executemany("""INSERT OR REPLACE INTO fingerprint VALUES (?, ?, ?, ?, ?, ?, ?)""", rows)
+            self._connection.executemany(
+                """DELETE FROM fingerprint WHERE source = ? AND source_id = ?""",
+                [(source, source_id) for source_id in changes['deleted']],
+            )
+
+    def close(self):
+        self._connection.close()
+
+
+def writeChangeset(changes, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(changes, f, ensure_ascii=False, indent=1)
+
+def freshIds(source, max_age=RECHECK_AFTER, store_path='crawl_state.sqlite3'):
+    store = FingerprintStore(store_path)
+    try:
+        return store.fresh(source, max_age)
+    finally:
+        store.close()
+
+def lastRecords(source, store_path='crawl_state.sqlite3'):
+    store = FingerprintStore(store_path)
+    try:
+        return store.records(source)
+    finally:
+        store.close()
+
+def emitChangeset(source, ids, frame, path, unchanged=(), validators=None, complete=True, cached=(), store_path='crawl_state.sqlite3'):
+    # 크롤러 공용: 이번 결과(frame)와 지난 지문을 비교해 changeset 파일을 쓰고 지문을 갱신한다.
+    # unchanged = 받지 않았지만 그대로인 id (304, 건너뛴 페이지, 가져오지 못한 페이지)
+    # cached = frame 에 들어 있지만 일부 값은 페이지 대신 지난 레코드에서 채운 id
+    records = frameRecords(ids, frame)
+    store = FingerprintStore(store_path)
+    try:
+        changes, digests = store.diff(source, records, unchanged, complete)
+        writeChangeset(changes, path)
+        store.commit(source, changes, digests, validators, records, cached)
+    finally:
+        store.close()
+    print(f"{source}: 추가 {len(changes['inserted'])}, 수정 {len(changes['updated'])}, 삭제 {len(changes['deleted'])}")
+    return changes
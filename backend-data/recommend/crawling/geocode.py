@@ -0,0 +1,131 @@
+# 크롤러 공용 주소 -> 좌표 변환. 결과는 SQLite 에 저장해 두고 다시 크롤링할 때는 API 를 부르지 않는다
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# get_location 이 찾지 못했을 때 돌려주던 값
+NOT_FOUND = {"lat": 'not found', "lng": 'not found'}
+
+def normalizeAddress(address):
+    address = unicodedata.normalize('NFKC', address or '')
+    return re.sub(r'\s+', ' ', address).strip()
+
+
+class KakaoGeocoder:
+    # 카카오 로컬 주소 검색. (lat, lng) 문자열, 결과가 없으면 None. 통신 오류는 예외 그대로
+    url = 'https://dapi.kakao.com/v2/local/search/address.json'
+
+    def __init__(self, api_key=None, session=None, timeout=10):
+        # 카카오 REST API 키는 코드에 두지 않고 KAKAO_REST_API_KEY 환경 변수로 받는다
+        self.api_key = api_key or os.environ.get('KAKAO_REST_API_KEY')
+        if not self.api_key:
+            raise RuntimeError('KAKAO_REST_API_KEY is not set')
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def geocode(self, address):
+        headers = {"Authorization": f"KakaoAK {self.api_key}"}
+        response = self.session.get(self.url, params={'query': address}, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        documents = response.json().get('documents') or []
+        if not documents or not documents[0].get('address'):
+            return None
+        address = documents[0]['address']
+        return str(address['y']), str(address['x'])
+
+
+class GeocodeCache:
+    # 정규화한 주소 -> 좌표. 못 찾은 주소도 저장해 두고 negative_ttl 이 지나면 다시 물어본다
+    def __init__(self, path='geocode_cache.sqlite3', negative_ttl=30 * 24 * 60 * 60):
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            """CREATE TABLE IF NOT EXISTS geocode (address TEXT PRIMARY KEY, lat TEXT, lng TEXT, found INTEGER NOT NULL, updated_at REAL NOT NULL)"""
+        )
+        self._connection.commit()
+
+    def getMany(self, addresses):
+        # {주소: (lat, lng) 또는 None(못 찾음)}. 캐시에 없거나 만료된 주소는 빠진다
+        result = {}
+        expire = time.time() - self.negative_ttl
+        addresses = list(addresses)
+        with self._lock:
+            for start in range(0, len(addresses), 500):
+                chunk = addresses[start:start + 500]
+                rows = self._connection.execute(
+                    f"SELECT address, lat, lng, found, updated_at FROM geocode WHERE address IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for address, lat, lng, found, updated_at in rows:
+                    if found:
+                        result[address] = (lat, lng)
+                    elif updated_at >= expire:
+                        result[address] = None
+        return result
+
+    def putMany(self, items):
+        now = time.time()
+        rows = [(address, *(crd or (None, None)), int(crd is not None), now) for address, crd in items.items()]
+        with self._lock:
+            self._connection.executemany("""INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?)""", rows)
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+class Geocoder:
+    # backend 는 geocode(address) -> (lat, lng) 또는 None 을 가진 객체 (테스트에서는 가짜로 바꾼다)
+    def __init__(self, backend=None, cache=None, max_workers=4):
+        self.backend = backend or KakaoGeocoder()
+        self.cache = cache or GeocodeCache()
+        self.max_workers = max_workers
+        self.hits = 0
+        self.calls = 0
+
+    def _lookup(self, address):
+        try:
+            return address, self.backend.geocode(address), True
+        except Exception as e:
+            # 통신 오류는 저장하지 않고 다음 크롤링 때 다시 시도
+            logger.warning('geocode failed for %s: %s', address, e)
+            return address, None, False
+
+    def resolveMany(self, addresses):
+        # {원래 주소: {"lat": ..., "lng": ...}} (get_location 과 같은 모양)
+        addresses = list(addresses)
+        keys = {address: normalizeAddress(address) for address in addresses}
+        unique = [key for key in dict.fromkeys(keys.values()) if key]
+
+        found = self.cache.getMany(unique)
+        misses = [key for key in unique if key not in found]
+        self.hits += len(unique) - len(misses)
+
+        if misses:
+            resolved = {}
+            with ThreadPoolExecutor(self.max_workers) as pool:
+                for key, crd, ok in pool.map(self._lookup, misses):
+                    found[key] = crd
+                    if ok:
+                        resolved[key] = crd
+            self.calls += len(misses)
+            self.cache.putMany(resolved)
+
+        result = {}
+        for address, key in keys.items():
+            crd = found.get(key)
+            result[address] = NOT_FOUND.copy() if crd is None else {"lat": crd[0], "lng": crd[1]}
+        return result
+
+    def resolve(self, address):
+        return self.resolveMany([address])[address]
@@ -0,0 +1,70 @@
+# 인허가 데이터(restdata.csv)를 한 번만 읽어서 노포 이름으로 바로 찾는 색인
+import csv
+import re
+import unicodedata
+
+# restdata.csv 컬럼
+# 0 : 인허가 날짜
+# 4 : 지번 주소
+# 7 : 사업자명(레스토랑 이름)
+# 11: 업종
+DATE, ADDRESS, NAME, SECTORS = 0, 4, 7, 11
+
+def normalizeName(name):
+    # 전각/반각, 공백, 대소문자, (주) 같은 괄호와 문장부호 차이를 없앤다
+    name = unicodedata.normalize('NFKC', name or '')
+    name = re.sub(r'\(.*?\)|주식회사', '', name)
+    return re.sub(r'[\W_]+', '', name).lower()
+
+def districtOf(address):
+    # "서울특별시 중구 충무로14길 2-1" -> "중구"
+    for token in (address or '').split():
+        if token.endswith('구') and len(token) > 1:
+            return token
+    return None
+
+
+class LicenseIndex:
+    # 이름(그대로 / 정규화) x 구 로 나눈 dict 네 개. 같은 키가 여러 번 나오면 파일에서 마지막 행 (기존 스캔과 같음)
+    def __init__(self, rows):
+        self.exact = {}
+        self.exact_district = {}
+        self.normalized = {}
+        self.normalized_district = {}
+
+        for line in rows:
+            if len(line) <= SECTORS:
+                continue
+            info = (line[DATE][:4], line[SECTORS])
+            name = line[NAME]
+            normalized = normalizeName(name)
+            district = districtOf(line[ADDRESS])
+
+            self.exact[name] = info
+            self.normalized[normalized] = info
+            if district is not None:
+                self.exact_district[(name, district)] = info
+                self.normalized_district[(normalized, district)] = info
+
+    @classmethod
+    def load(cls, path='restdata.csv', encoding='utf-8'):
+        with open(path, 'r', encoding=encoding, newline='') as f:
+            return cls(csv.reader(f))
+
+    def __len__(self):
+        return len(self.exact)
+
+    def lookup(self, name, address=None):
+        # (인허가 연도, 업종) 또는 None. 같은 구의 같은 이름 -> 같은 이름 -> 정규화한 이름 순
+        district = districtOf(address)
+        normalized = normalizeName(name)
+        for index, key in (
+            (self.exact_district, (name, district)),
+            (self.exact, name),
+            (self.normalized_district, (normalized, district)),
+            (self.normalized, normalized),
+        ):
+            info = index.get(key)
+            if info is not None:
+                return info
+        return None
@@ -0,0 +1,180 @@
+# 다이닝코드 profile.php 페이지를 동시에 가져와서 파싱하는 모듈
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup as bs
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+PROFILE_URL = "https://diningcode.com/profile.php?rid={rid}"
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 6.3; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/63.0.3239.132 Safari/537.36'}
+
+# 다시 시도할 응답 코드
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 조건부 요청에 304 가 오면 파싱 결과 대신 이 값
+NOT_MODIFIED = 'not modified'
+
+
+def parseProfile(html):
+    # profile.php 한 페이지 -> dict. 이름/주소처럼 꼭 있어야 하는 값이 없으면 None
+    soup = bs(html, "lxml")
+    try:
+        restro_star = soup.find('div', attrs={"class": "s-list appraisal"}).find('p', attrs={"class": "tit"}).get_text()
+        restro_star = int(restro_star.split("건")[0])
+    except:
+        restro_star = 0
+
+    try:
+        restro_menus = soup.find('ul', attrs={"class": "list Restaurant_MenuList"}).findAll('li')
+    except:
+        restro_menus = []
+
+    try:
+        restro_thumbnail = soup.find('li', attrs={"class": "bimg btn-gallery-open"}).find('img').get('src')
+    except:
+        restro_thumbnail = ""
+
+    try:
+        restro_name = soup.find('div', attrs={"class": "tit-point"}).find('p', attrs={"class": "tit"}).get_text()
+        restro_artis = soup.find('ul', attrs={"class": "app-arti"}).findAll('p', {"class": "icon"})
+        restro_address = soup.find('div', attrs={"class": "s-list basic-info"}).find("li", {"class": "locat"}).get_text()
+        restro_number = soup.find('li', attrs={"class": "tel"}).get_text()
+    except AttributeError:
+        return None
+
+    restro_tag_dic = {}
+    for restro_arti in restro_artis:
+        restro_arti = restro_arti.get_text()
+        key = restro_arti.split("(")[0]
+        value = int(restro_arti.split("(")[-1][:-1])
+        restro_tag_dic[key] = value
+
+    restro_menu_dic = {}
+    for restro_menu in restro_menus:
+        key = restro_menu.find("span", attrs={"class": "Restaurant_Menu"}).get_text()
+        value = restro_menu.find("p", attrs={"class": "r-txt Restaurant_MenuPrice"}).get_text()
+        restro_menu_dic[key] = value
+
+    return {
+        'star': restro_star,
+        'name': restro_name,
+        'tags': restro_tag_dic,
+        'menus': restro_menu_dic,
+        'address': restro_address,
+        'number': restro_number,
+        'thumbnail': restro_thumbnail,
+    }
+
+
+class HostRateLimiter:
+    # 호스트마다 초당 rate 번까지 (요청 시작 간격을 1/rate 초로 맞춘다)
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ProfileFetcher:
+    # 세션 하나(커넥션 풀)를 같이 쓰는 스레드들이 가져오고, 파싱은 프로세스 풀에서 한다
+    def __init__(self, url=PROFILE_URL, max_workers=8, rate=5.0, retries=3, backoff=0.5, timeout=10, parse_workers=None, session=None):
+        self.url = url
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        # 0 이면 가져온 스레드에서 바로 파싱
+        self.parse_workers = os.cpu_count() if parse_workers is None else parse_workers
+        self.limiter = HostRateLimiter(rate)
+        # 200 응답의 {rid: (ETag, Last-Modified)} (다음 증분 크롤링의 조건부 요청용)
+        self.validators = {}
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(HEADERS)
+        self.session = session
+
+    def _retryDelay(self, attempt, response=None):
+        if response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff * (2 ** attempt)
+
+    def fetchPage(self, rid, validator=None):
+        # 실패하면 None (404 같은 응답은 다시 시도하지 않는다). validator = 지난번 (ETag, Last-Modified)
+        url = self.url.format(rid=rid)
+        headers = {}
+        if validator is not None:
+            etag, last_modified = validator
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        for attempt in range(self.retries + 1):
+            self.limiter.wait(url)
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                logger.warning('%s: %s', url, e)
+                delay = self._retryDelay(attempt)
+            else:
+                if response.status_code == 200:
+                    if 'ETag' in response.headers or 'Last-Modified' in response.headers:
+                        self.validators[str(rid)] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+                    return response.text
+                if response.status_code == 304:
+                    return NOT_MODIFIED
+                if response.status_code not in RETRY_STATUS:
+                    logger.warning('%s: HTTP %s', url, response.status_code)
+                    return None
+                logger.warning('%s: HTTP %s, retrying', url, response.status_code)
+                delay = self._retryDelay(attempt, response)
+            if attempt < self.retries:
+                time.sleep(delay)
+        return None
+
+    def fetchAll(self, rids, validators=None):
+        # (rid, 파싱 결과 또는 None 또는 NOT_MODIFIED) 을 rids 순서대로
+        rids = list(rids)
+        validators = validators or {}
+        parse_pool = ProcessPoolExecutor(self.parse_workers) if self.parse_workers else None
+        try:
+            with ThreadPoolExecutor(self.max_workers) as fetch_pool:
+                pages = [fetch_pool.submit(self.fetchPage, rid, validators.get(str(rid))) for rid in rids]
+                parsed = []
+                # 앞에서부터 도착하는 대로 파싱을 넘기므로 가져오기와 파싱이 겹쳐서 돈다
+                for page in pages:
+                    html = page.result()
+                    if html is None or html is NOT_MODIFIED:
+                        parsed.append(html)
+                    elif parse_pool is None:
+                        parsed.append(parseProfile(html))
+                    else:
+                        parsed.append(parse_pool.submit(parseProfile, html))
+
+            for rid, profile in zip(rids, parsed):
+                yield rid, profile.result() if hasattr(profile, 'result') else profile
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown()
@@ -8,6 +8,10 @@ import pandas as pd
 import re
 import requests
 from bs4 import BeautifulSoup
+from geocode import Geocoder
+# 증분 크롤링 (python youtubekim.py --incremental)
+from changeset import emitChangeset, freshIds, lastRecords
+import sys
 
 # pip install --upgrade google-api-python-client
 # pip install --upgrade google-auth-oauthlib google-auth-httplib2
@@ -35,6 +39,13 @@ playlistitems_list_request = youtube.playlistItems().list(
     maxResults = 50
 )
 
+# 증분 모드면 최근에 받은 영상은 watch 페이지를 다시 받지 않고 태그는 지난 레코드 값을 쓴다 (RECHECK_AFTER 가 지나면 다시 받음).
+# 제목/설명은 재생목록 응답에 이미 있으므로 항상 지문에 넣어 수정이 바로 잡히게 한다
+incremental = '--incremental' in sys.argv
+fresh_ids = freshIds('youtube') if incremental else set()
+last_records = lastRecords('youtube') if incremental else {}
+cached = []
+
 video_ids = []
 video_titles = []
 video_info_title = []
@@ -75,26 +86,6 @@ while playlistitems_list_request:
         video_titles.append(title)
         video_ids.append(video_id)
 
-        def get_location(address):
-            url = 'https://dapi.kakao.com/v2/local/search/address.json?query=' + address
-            # 'KaKaoAK '는 그대로 두시고 개인키만 지우고 입력해 주세요.
-            # ex) KakaoAK 6af8d4826f0e56c54bc794fa8a294
-            headers = {"Authorization": "KakaoAK dca00a6145957259d9c0b9b788ecb425"}
-            api_json = json.loads(str(requests.get(url,headers=headers).text))
-            try:
-                address = api_json['documents'][0]['address']
-                crd = {"lat": str(address['y']), "lng": str(address['x'])}
-            except:
-                crd = {"lat": 'not found', "lng": 'not found'}
-            return crd
-
-        crd = get_location(info[2])
-
-        restro_location_y = crd["lat"]
-        restro_location_x = crd["lng"]
-
-        video_info_location_x.append(restro_location_x)
-        video_info_location_y.append(restro_location_y)
         video_info_age.append('')
         video_info_thumbnail.append('')
         video_info_phone_number.append('')
@@ -113,6 +104,11 @@ while playlistitems_list_request:
         quiet.append('')
         real_local.append('')
 
+        if video_id in fresh_ids and video_id in last_records:
+            video_info_tag.append(last_records[video_id]['etc'])
+            cached.append(video_id)
+            continue
+
         url = f'https://www.youtube.com/watch?v={video_id}'
         html = requests.get(url)
         soup = BeautifulSoup(html.text, 'lxml')
@@ -127,6 +123,12 @@ while playlistitems_list_request:
         playlistitems_list_request, playlistitems_list_response
     )
 
+# 좌표는 캐시에 없는 주소만 한꺼번에 물어본다
+crds = Geocoder().resolveMany(video_info_location)
+for location in video_info_location:
+    video_info_location_y.append(crds[location]["lat"])
+    video_info_location_x.append(crds[location]["lng"])
+
 video_df = pd.DataFrame()
 video_df['resto_age'] = video_info_age
 video_df['thumbnail'] = video_info_thumbnail
@@ -154,7 +156,10 @@ video_df['etc'] = video_info_tag
 video_df['video_title'] = video_titles
 video_df['video_id'] = video_ids
 
-video_df.to_csv("video_list.csv", mode='w', encoding='utf8')
+if incremental:
+    emitChangeset('youtube', video_ids, video_df, 'video_changes.json', cached=cached)
+else:
+    video_df.to_csv("video_list.csv", mode='w', encoding='utf8')
 # 여기까지가 김사원 세끼 서울 지역 노포 정보 불러오기
 # 아래부터는 영상에 대한 댓글 api
 
@@ -0,0 +1,58 @@
+from recommend.recom.knn import selectReviewsAfter, selectReviewCount
+from recommend.recom.service import WatermarkStore
+
+
+class RatingAggregates(WatermarkStore):
+    # 노포별 리뷰 수, 평점 합, 평균을 메모리에 들고 있는 집계 저장소 (review.id 워터마크)
+    name = 'Rating aggregates'
+
+    def __init__(self, check_interval=30, full_reload_interval=60 * 60):
+        super().__init__(check_interval, full_reload_interval)
+        self.stats = {}
+
+    def selectCount(self):
+        return selectReviewCount()
+
+    def selectAfter(self, reviewId, maxId):
+        return selectReviewsAfter(reviewId, maxId)
+
+    @staticmethod
+    def _apply(stats, rows):
+        for row in rows:
+            count, total = stats.get(row['resto_id'], (0, 0.0))
+            stats[row['resto_id']] = (count + 1, total + float(row['rating']))
+
+    def load(self, rows):
+        stats = {}
+        self._apply(stats, rows)
+        self.stats = stats
+
+    def append(self, rows):
+        # 읽는 쪽은 항상 완성된 dict 만 보도록 복사본에 더한 뒤 교체
+        stats = dict(self.stats)
+        self._apply(stats, rows)
+        self.stats = stats
+
+    def get(self, restoId):
+        self._ensureLoaded()
+        return self.stats.get(restoId)
+
+    def rating(self, restoId):
+        stat = self.get(restoId)
+        if stat is None:
+            return None
+        count, total = stat
+        return total / count
+
+    def ratings(self, idList):
+        self._ensureLoaded()
+        stats = self.stats
+        result = {}
+        for restoId in idList:
+            if restoId in stats:
+                count, total = stats[restoId]
+                result[restoId] = total / count
+        return result
+
+
+ratingAggregates = RatingAggregates()
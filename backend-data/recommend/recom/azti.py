@@ -0,0 +1,61 @@
+import threading
+
+import numpy as np
+
+from recommend.recom.catalog import getCatalog
+
+aztiList = ['mcis', 'dcis', 'mnis', 'dnis', 'mchs', 'dchs','mnhs', 'dnhs', 'mchc', 'dchc', 'mnhc', 'dnhc', 'mcic', 'dcic', 'mnic', 'dnic']
+
+# AZTI 글자 위치별 (요소, 요소가 있을 때(> 0)의 글자). 비트는 앞 글자부터 8, 4, 2, 1
+aztiElements = [('terrace', 'm'), ('cost_effective', 'c'), ('real_local', 'h'), ('drinking', 's')]
+
+def aztiCode(aztitype):
+    code = 0
+    for letter, (element, positive) in zip(aztitype, aztiElements):
+        code = code * 2 + (letter == positive)
+    return code
+
+
+class AztiIndex:
+    # 노포마다 AZTI 4비트 코드를 미리 계산해 16개 유형별 목록으로 나눠둔다
+    def __init__(self, catalog):
+        self.version = catalog.version
+
+        codes = np.zeros(len(catalog), dtype=np.int64)
+        valid = np.ones(len(catalog), dtype=bool)
+        for element, positive in aztiElements:
+            values = catalog.array(element)
+            # 값이 없는 노포는 (SQL 의 > 0, = 0 과 같이) 어느 유형에도 들어가지 않는다
+            valid &= (values > 0) | (values == 0)
+            codes = codes * 2 + (values > 0)
+        self.codes = np.where(valid, codes, -1)
+
+        # 해당 유형 노포가 없으면 야외좌석 있는 노포로 대체 (미리 결정)
+        self.fallback = np.flatnonzero(catalog.array('terrace') > 0)
+        self.buckets = {}
+        for aztitype in aztiList:
+            rows = np.flatnonzero(self.codes == aztiCode(aztitype))
+            self.buckets[aztitype] = rows if len(rows) else self.fallback
+
+    def rows(self, aztitype):
+        return self.buckets.get(aztitype, self.fallback)
+
+
+_azti_index = None
+_azti_lock = threading.Lock()
+
+def getAztiIndex(catalog=None):
+    global _azti_index
+    catalog = getCatalog() if catalog is None else catalog
+    index = _azti_index
+    if index is None or index.version != catalog.version:
+        with _azti_lock:
+            index = _azti_index
+            if index is None or index.version != catalog.version:
+                index = _azti_index = AztiIndex(catalog)
+    return index
+
+def aztiRestos(aztitype):
+    # 같은 버전의 목록과 색인을 같이 써야 행 번호가 맞는다
+    catalog = getCatalog()
+    return catalog.rows(getAztiIndex(catalog).rows(aztitype), joined=True)
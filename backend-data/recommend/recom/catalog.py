@@ -0,0 +1,78 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from recommend.recom.knn import selectCatalog, selectCatalogVersion
+from recommend.recom.service import ModelService
+
+
+class Catalog:
+    # old_restaurant ⋈ element 를 컬럼 단위 리스트로 들고 있는 노포 목록 캐시 (id -> 행 번호 색인 포함)
+    def __init__(self, rows, restaurant_columns, version=None):
+        self.joined_columns = list(rows[0].keys()) if rows else list(restaurant_columns)
+        self.restaurant_columns = [column for column in restaurant_columns if column in self.joined_columns]
+        self.columns = {column: [row.get(column) for row in rows] for column in self.joined_columns}
+
+        self.ids = np.asarray(self.columns.get('id', []), dtype=np.int64)
+        self.id_index = {}
+        for row, resto_id in enumerate(self.columns.get('id', [])):
+            self.id_index.setdefault(resto_id, row)
+
+        self.version = version
+        self.loaded_at = time.time()
+        self._arrays = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def array(self, column):
+        # 숫자 컬럼을 numpy 배열로 (None, 문자열은 NaN)
+        if column not in self._arrays:
+            self._arrays[column] = pd.to_numeric(pd.Series(self.columns[column], dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+        return self._arrays[column]
+
+    def row(self, row, joined=False):
+        columns = self.joined_columns if joined else self.restaurant_columns
+        return {column: self.columns[column][row] for column in columns}
+
+    def rows(self, rows, joined=False):
+        return [self.row(row, joined) for row in rows]
+
+    def byId(self, restoId, joined=False):
+        row = self.id_index.get(int(restoId))
+        if row is None:
+            return None
+        return self.row(row, joined)
+
+    def byIds(self, idList, joined=False):
+        # 요청한 순서대로, 중복과 없는 id 는 빼고
+        rows = []
+        for restoId in dict.fromkeys(int(restoId) for restoId in idList):
+            row = self.id_index.get(restoId)
+            if row is not None:
+                rows.append(row)
+        return self.rows(rows, joined)
+
+    def all(self, joined=False):
+        return self.rows(range(len(self)), joined)
+
+    def frame(self, columns=None):
+        columns = self.joined_columns if columns is None else columns
+        return pd.DataFrame({column: self.columns[column] for column in columns}, columns=columns)
+
+
+class CatalogService(ModelService):
+    def needsTraining(self):
+        return self.model is None or selectCatalogVersion() != self.model.version
+
+
+def buildCatalog():
+    version = selectCatalogVersion()
+    rows, restaurant_columns = selectCatalog()
+    return Catalog(rows, restaurant_columns, version)
+
+catalogService = CatalogService('Restaurant catalog', buildCatalog, check_interval=60)
+
+def getCatalog():
+    return catalogService.getModel(wait=True)
@@ -5,22 +5,13 @@ import warnings
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from features import makeEtc
+
 
 warnings.filterwarnings('ignore')
 
-elements = ['terrace', 'drinking', 'meal', 'lunch', 'dinner', 'cost_effective', 'classy', 'mood', 'noisy', 'quiet', 'real_local']
 restos_data = pd.read_csv('restodata_list.csv')
-for i in range(len(restos_data)):
-    try:
-        restos_data.loc[i, 'etc'] = restos_data.loc[i, 'etc'].replace(' ' , '').replace(',', ' ')
-    except:
-        restos_data.loc[i, 'etc'] = ''
-
-    for element in elements:
-        if restos_data.loc[i, element] == 'NaN':
-            continue
-        elif restos_data.loc[i, element] >= 1:
-            restos_data.loc[i, 'etc'] += ' ' + element
+restos_data = makeEtc(restos_data)
 
 count_vect = CountVectorizer(min_df=0, ngram_range=(1, 2))
 cat_mat = count_vect.fit_transform(restos_data['etc'])
@@ -0,0 +1,83 @@
+import threading
+import warnings
+
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.preprocessing import normalize
+
+from recommend.recom.catalog import getCatalog
+from recommend.recom.features import makeEtc
+
+
+class CbfModel:
+    # 노포 태그(etc) 기반 CBF 모델. 한 번 만들어 두고 모든 요청이 같이 쓴다.
+    def __init__(self, restos_data, version=None):
+        warnings.filterwarnings('ignore')
+        self.version = version
+
+        restos_data = makeEtc(restos_data.reset_index(drop=True))
+
+        self.count_vect = CountVectorizer(min_df=0, ngram_range=(1, 2))
+        self.cat_mat = self.count_vect.fit_transform(restos_data['etc'])
+        # 행마다 L2 정규화 해두면 내적이 곧 코사인 유사도
+        self.norm_mat = normalize(self.cat_mat.tocsr(), norm='l2')
+        self.records = restos_data.to_dict(orient='records')
+        self.ids = restos_data['id'].to_numpy()
+
+        # 이름, id -> 행 번호 (같은 이름이면 첫 번째 행)
+        self.name_index = {}
+        self.id_index = {}
+        for row, record in enumerate(self.records):
+            self.name_index.setdefault(record['resto_name'], row)
+            self.id_index.setdefault(record['id'], row)
+
+    def __len__(self):
+        return len(self.records)
+
+    def topRows(self, row, top_n=10):
+        # 입력한 노포 한 행과 전체의 유사도만 계산 (N x N 행렬을 만들지 않는다)
+        similarity = (self.norm_mat @ self.norm_mat[row].T).toarray().ravel()
+
+        # 상위 top_n개만 부분 선택한 뒤 그 안에서만 내림차순 정렬
+        top_n = min(top_n, len(similarity))
+        if top_n <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        final_index = np.argpartition(-similarity, top_n - 1)[:top_n]
+        final_index = final_index[np.argsort(-similarity[final_index], kind='stable')]
+        return final_index, similarity[final_index]
+
+    def topK(self, resto_id, k=10):
+        rows, scores = self.topRows(self.id_index[int(resto_id)], k)
+        return self.ids[rows], scores
+
+    def findSimResto(self, row, top_n=10):
+        final_index, similarity = self.topRows(row, top_n)
+
+        result = []
+        for i, score in zip(final_index, similarity):
+            record = dict(self.records[i])
+            record['similarity'] = float(score)
+            result.append(record)
+        return result
+
+    def findSimRestoByName(self, resto_name, top_n=10):
+        return self.findSimResto(self.name_index[resto_name], top_n)
+
+    def findSimRestoById(self, resto_id, top_n=10):
+        return self.findSimResto(self.id_index[int(resto_id)], top_n)
+
+
+_cbf_model = None
+_cbf_lock = threading.Lock()
+
+def getCbfModel(catalog=None):
+    # 노포 목록 버전이 바뀌었을 때만 다시 만든다. catalog 를 주면 그 목록으로 만든 모델
+    global _cbf_model
+    catalog = getCatalog() if catalog is None else catalog
+    model = _cbf_model
+    if model is None or model.version != catalog.version:
+        with _cbf_lock:
+            model = _cbf_model
+            if model is None or model.version != catalog.version:
+                model = _cbf_model = CbfModel(catalog.frame(), catalog.version)
+    return model
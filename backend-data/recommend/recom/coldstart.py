@@ -0,0 +1,69 @@
+from recommend.recom.azti import aztiList, getAztiIndex
+from recommend.recom.catalog import catalogService, getCatalog
+from recommend.recom.cbfmodel import getCbfModel
+from recommend.recom.neighbors import neighborService
+from recommend.recom.service import ModelService
+
+def makeCbfList(aztitype, catalog, cbf_model, table):
+    # AZTI 유형 첫 번째 노포와 비슷한 노포 10개(CBF) + 그 중 첫 번째 노포의 아이템 기반 CF 이웃
+    azti_rows = getAztiIndex(catalog).rows(aztitype)
+    request_title = catalog.columns['resto_name'][azti_rows[0]]
+    request_num = 10
+
+    result_cbf = cbf_model.findSimRestoByName(request_title, request_num)
+    restoId = result_cbf[0]['id']
+
+    try:
+        id_list = table.neighbors(restoId).index.values
+    except (AttributeError, KeyError):
+        # CF 표가 아직 없거나 리뷰 없는 노포
+        id_list = ()
+    result_cf = catalog.byIds(id_list)
+
+    return result_cbf, result_cf
+
+def aztiRecommVersion(catalog, table):
+    return (catalog.version, None if table is None else table.trained_at)
+
+
+class AztiRecommendations:
+    # 16개 AZTI 유형별 CBF + CF 추천 목록을 미리 만들어 둔 표
+    def __init__(self, catalog, cbf_model, table):
+        self.version = aztiRecommVersion(catalog, table)
+        self.catalog = catalog
+        self.cbf_model = cbf_model
+        self.table = table
+        self.lists = {aztitype: makeCbfList(aztitype, catalog, cbf_model, table) for aztitype in aztiList}
+
+    def _lists(self, aztitype):
+        if aztitype in self.lists:
+            return self.lists[aztitype]
+        return makeCbfList(aztitype, self.catalog, self.cbf_model, self.table)
+
+    def get(self, aztitype):
+        result_cbf, result_cf = self._lists(aztitype)
+        # 응답에 평점 등을 붙이므로 복사본을 돌려준다
+        return [dict(item) for item in result_cbf + result_cf]
+
+    def getCbf(self, aztitype):
+        result_cbf, _ = self._lists(aztitype)
+        return [dict(item) for item in result_cbf]
+
+
+class AztiRecommService(ModelService):
+    # 노포 목록 버전이나 CF 표가 바뀌면 백그라운드에서 다시 만든다 (요청은 그동안 지금 표로 응답)
+    def needsTraining(self):
+        if self.model is None or catalogService.model is None:
+            return True
+        return self.model.version != aztiRecommVersion(catalogService.model, neighborService.model)
+
+
+def buildAztiRecommendations():
+    # 키(version)와 CBF 모델이 같은 노포 목록으로 만들어지도록 catalog 를 한 번만 읽는다
+    catalog = getCatalog()
+    return AztiRecommendations(catalog, getCbfModel(catalog), neighborService.getModel())
+
+aztiRecommService = AztiRecommService('AZTI recommendations', buildAztiRecommendations, check_interval=10)
+
+def getAztiRecommendations():
+    return aztiRecommService.getModel(wait=True)
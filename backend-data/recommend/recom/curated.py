@@ -0,0 +1,72 @@
+import time
+
+from recommend.recom.aggregates import ratingAggregates
+from recommend.recom.catalog import getCatalog
+from recommend.recom.enrich import enrichRestos
+from recommend.recom.knn import selectCollectionVersion
+from recommend.recom.response import JsonPayload, dumps
+from recommend.recom.leaderboard import likedLeaderboard
+from recommend.recom.service import ModelService
+
+# 개발자 추천, 유튜버 추천 노포 (selectDeveloper, selectYoutuber 와 같은 목록)
+developerIds = (1445, 994, 1098, 1431, 563, 666, 277, 616, 995, 1222, 1430, 363, 1401, 1358, 473, 684, 62, 1131, 1402)
+youtuberIds = (1428, 732, 133, 596, 828, 1080, 1189, 1000, 987, 764, 129, 814, 66, 806, 369, 1104, 1265, 646, 1380, 941, 386)
+
+def likedIds(n=20):
+    return [restoId for restoId, _ in likedLeaderboard.top(n)]
+
+def trendingIds(n=20):
+    return [restoId for restoId, _ in likedLeaderboard.trending(n)]
+
+
+class CuratedCollections:
+    # 홈 화면 목록(개발자, 유튜버, 좋아요 많은 노포, 요즘 뜨는 노포)을 평점, 리뷰까지 붙여 JSON 으로 직렬화해 둔다
+    def __init__(self, catalog, liked_ids, trending_ids=(), version=None):
+        self.version = version
+        self.trained_at = time.time()
+
+        # SELECT ... WHERE id IN (...) 처럼 id 순서
+        lists = {
+            'devList': catalog.byIds(sorted(developerIds), joined=True),
+            'youList': catalog.byIds(sorted(youtuberIds), joined=True),
+            'likeList': catalog.byIds(liked_ids),
+            'trendList': catalog.byIds(trending_ids),
+        }
+        # 세 목록의 리뷰를 쿼리 한 번으로
+        enrichRestos([item for items in lists.values() for item in items], review=True)
+
+        self.payloads = {key: JsonPayload(dumps({key: items})) for key, items in lists.items()}
+
+    def payload(self, key):
+        return self.payloads[key]
+
+
+def collectionVersion():
+    return (selectCollectionVersion(), getCatalog().version)
+
+
+class CuratedService(ModelService):
+    # 좋아요/리뷰 워터마크나 노포 목록 버전이 바뀌었거나 max_age 가 지나면 다시 만든다
+    def __init__(self, name, build, max_age=10 * 60, check_interval=30):
+        super().__init__(name, build, check_interval)
+        self.max_age = max_age
+
+    def needsTraining(self):
+        if self.model is None:
+            return True
+        if time.time() - self.model.trained_at >= self.max_age:
+            return True
+        return collectionVersion() != self.model.version
+
+
+def buildCuratedCollections():
+    # 버전을 먼저 읽고 좋아요/평점을 바로 갱신해야 목록이 버전보다 오래된 데이터로 만들어지지 않는다
+    version = collectionVersion()
+    likedLeaderboard.refresh()
+    ratingAggregates.refresh()
+    return CuratedCollections(getCatalog(), likedIds(), trendingIds(), version)
+
+curatedService = CuratedService('Curated collections', buildCuratedCollections)
+
+def curatedPayload(key):
+    return curatedService.getModel(wait=True).payload(key)
@@ -1,14 +1,165 @@
 import os, json, pymysql
+import threading
+import time
+from contextlib import contextmanager
 
 def connectMySQL():
     connect = pymysql.connect(
-        user='${user}', 
-        password='${password}',, 
+        user='${user}',
+        password='${password}',
         host='${host}',
-        db='${db}', 
+        db='${db}',
         charset='utf8mb4',
         cursorclass=pymysql.cursors.DictCursor
     )
     curs = connect.cursor()
 
     return connect, curs
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    # 스레드 안전한 pymysql 커넥션 풀. 요청마다 새로 접속하지 않고 커넥션을 재사용한다
+    def __init__(self, connect, size=10, timeout=5.0, ping_interval=30.0):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+        self._metrics = {
+            'checkouts': 0,
+            'waits': 0,
+            'timeouts': 0,
+            'reconnects': 0,
+            'discarded': 0,
+            'max_wait': 0.0,
+        }
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        with self._cond:
+            if not self._idle and self._created >= self.size:
+                self._metrics['waits'] += 1
+            while not self._idle and self._created >= self.size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._metrics['timeouts'] += 1
+                    raise PoolTimeout(f'no MySQL connection available within {timeout}s (pool size {self.size})')
+                self._cond.wait(remaining)
+
+            if self._idle:
+                connection, last_used = self._idle.pop()
+            else:
+                connection, last_used = None, None
+                self._created += 1
+
+            self._metrics['checkouts'] += 1
+            self._metrics['max_wait'] = max(self._metrics['max_wait'], time.monotonic() - start)
+
+        # 접속/ping 은 락 밖에서
+        try:
+            if connection is None:
+                connection = self.connect()
+            elif time.monotonic() - last_used >= self.ping_interval:
+                connection = self._healthy(connection)
+        except Exception:
+            with self._cond:
+                self._created -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def _healthy(self, connection):
+        try:
+            connection.ping(reconnect=False)
+            return connection
+        except Exception:
+            self._close(connection)
+            with self._cond:
+                self._metrics['reconnects'] += 1
+            return self.connect()
+
+    def release(self, connection, discard=False):
+        with self._cond:
+            if discard:
+                self._created -= 1
+                self._metrics['discarded'] += 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._close(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        except (pymysql.err.OperationalError, pymysql.err.InterfaceError):
+            # 끊어진 커넥션은 풀에 돌려놓지 않는다
+            self.release(connection, discard=True)
+            raise
+        except BaseException:
+            self.release(connection)
+            raise
+        else:
+            self.release(connection)
+
+    def closeAll(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for connection, _ in idle:
+            self._close(connection)
+
+    def afterFork(self):
+        # fork 된 워커는 물려받은 커넥션을 닫지 않고 버린다 (close 하면 부모와 같이 쓰는 소켓에 COM_QUIT 를 보낸다).
+        # 부모 스레드가 잡고 있던 잠금일 수도 있으므로 Condition 도 새로 만든다
+        self._idle = []
+        self._created = 0
+        self._cond = threading.Condition()
+
+    def stats(self):
+        with self._cond:
+            stats = dict(self._metrics)
+            stats.update({
+                'size': self.size,
+                'created': self._created,
+                'idle': len(self._idle),
+                'in_use': self._created - len(self._idle),
+            })
+        return stats
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+def poolConnect():
+    connect, curs = connectMySQL()
+    # 풀에서 재사용하는 커넥션이 예전 스냅샷을 보지 않도록 autocommit
+    connect.autocommit(True)
+    return connect
+
+pool = ConnectionPool(
+    poolConnect,
+    size=int(os.environ.get('DB_POOL_SIZE', 10)),
+    timeout=float(os.environ.get('DB_POOL_TIMEOUT', 5)),
+    ping_interval=float(os.environ.get('DB_POOL_PING_INTERVAL', 30)),
+)
+
+def mysqlConnection(timeout=None):
+    return pool.connection(timeout)
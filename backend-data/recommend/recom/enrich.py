@@ -0,0 +1,20 @@
+from recommend.recom.knn import selectRestoReviews
+from recommend.recom.aggregates import ratingAggregates
+
+def enrichRestos(restoList, review=False):
+    # 평균 평점은 메모리 집계에서 읽고, 리뷰는 목록 전체를 쿼리 한 번으로 가져와 각 노포에 붙인다
+    id_list = list(dict.fromkeys(item['id'] for item in restoList))
+
+    ratings = ratingAggregates.ratings(id_list)
+
+    reviews = {}
+    if review:
+        for row in selectRestoReviews(id_list):
+            reviews.setdefault(row['resto_id'], []).append(row)
+
+    for item in restoList:
+        # 리뷰가 없는 노포는 avg(rating) 과 같이 None
+        item['rating'] = ratings.get(item['id'])
+        if review:
+            item['review'] = list(reviews.get(item['id'], []))
+    return restoList
@@ -0,0 +1,18 @@
+import pandas as pd
+
+elements = ['terrace', 'drinking', 'meal', 'lunch', 'dinner', 'cost_effective', 'classy', 'mood', 'noisy', 'quiet', 'real_local']
+
+def makeEtc(restos_data):
+    # etc 태그를 CountVectorizer 입력 문서로 만든다. 행 단위 loc 대신 컬럼 단위로 한 번에 처리
+    etc = restos_data['etc']
+    is_text = etc.map(type).eq(str)
+    docs = etc.where(is_text, '').astype(str)
+    docs = docs.str.replace(' ', '', regex=False).str.replace(',', ' ', regex=False)
+
+    # 값이 1 이상인 요소 이름을 뒤에 붙인다 ('NaN', 빈 값은 건너뜀)
+    for element in elements:
+        has_element = pd.to_numeric(restos_data[element], errors='coerce').ge(1)
+        docs = docs.where(~has_element, docs + ' ' + element)
+
+    restos_data['etc'] = docs
+    return restos_data
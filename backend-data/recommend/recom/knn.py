@@ -1,6 +1,7 @@
 from re import U
 from sqlite3 import connect
 from recommend.recom.database import *
+from recommend.recom.ratingmatrix import RatingMatrix
 import pandas as pd
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
@@ -25,254 +26,143 @@ def selectUser(id, connect, curs):
     return user_info
 
 def selectLiked(userId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT COUNT(*) FROM nopo_db.liked WHERE user_id={userId}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = f"SELECT COUNT(*) FROM nopo_db.liked WHERE user_id={userId}"
+        cursor.execute(sql)
+
+        result = cursor.fetchall()
     return result
 
 def selectReview():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = """SELECT user_id, resto_id, rating FROM review"""
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    df = pd.DataFrame(result)
-    return df
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT user_id, resto_id, rating FROM review"""
+        cursor.execute(sql)
 
-def selectReviewByUserId(userId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT user_id, resto_id, rating FROM review WHERE user_id = {userId}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
+        result = cursor.fetchall()
     df = pd.DataFrame(result)
     return df
 
-def selectRestoRating(restoId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT avg(rating) FROM nopo_db.review WHERE resto_id = {restoId}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    return result
+def selectReviewCount():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT COUNT(*) AS cnt, MAX(id) AS max_id FROM review"""
+        cursor.execute(sql)
 
-def selectRestoReview(restoId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT review.id, content, rating, resto_id, user_id, nickname, profile_image FROM nopo_db.review LEFT OUTER JOIN user ON review.user_id = user.id WHERE resto_id = {restoId}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
+        result = cursor.fetchall()
     return result
 
-def selectDeveloper():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE old_restaurant.id IN (1445, 994, 1098, 1431, 563, 666, 277, 616, 995, 1222, 1430, 363, 1401, 1358, 473, 684, 62, 1131, 1402)"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    return result
+def selectReviewsAfter(reviewId, maxId):
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT id, resto_id, rating FROM review WHERE id > %s AND id <= %s ORDER BY id"""
+        cursor.execute(sql, (reviewId, maxId))
 
-def selectYoutuber():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE old_restaurant.id IN (1428, 732, 133, 596, 828, 1080, 1189, 1000, 987, 764, 129, 814, 66, 806, 369, 1104, 1265, 646, 1380, 941, 386)"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
+        result = cursor.fetchall()
     return result
 
-def selectThirtyNopo():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE grade = 'THIRTY' ORDER BY RAND() LIMIT 20"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    return result
+def selectRestoReviews(idList):
+    if len(idList) == 0:
+        return []
 
-def selectLikedNopo():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = f"SELECT resto_id, count(*) as cnt FROM nopo_db.liked group by resto_id order by cnt desc limit 20"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    return result
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = "SELECT review.id, content, rating, resto_id, user_id, nickname, profile_image FROM nopo_db.review LEFT OUTER JOIN user ON review.user_id = user.id WHERE resto_id IN %s ORDER BY review.id"
+        cursor.execute(sql, (tuple(int(id) for id in idList),))
 
-def selectLocationResto(locx, locy):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    min_x = locx - 0.054
-    max_x = locx + 0.054
-    min_y = locy - 0.054
-    max_y = locy + 0.054
-    sql = f"SELECT * FROM nopo_db.old_restaurant WHERE location_x < {max_x} and location_x > {min_x} and location_y < {max_y} and location_y > {min_y}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
+        result = cursor.fetchall()
     return result
 
-def OldRestaurantRandom():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
+def selectDeveloper():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE old_restaurant.id IN (1445, 994, 1098, 1431, 563, 666, 277, 616, 995, 1222, 1430, 363, 1401, 1358, 473, 684, 62, 1131, 1402)"
+        cursor.execute(sql)
 
-    sql = "SELECT * FROM nopo_db.old_restaurant ORDER BY RAND() LIMIT 2"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    # df = pd.DataFrame(result)
+        result = cursor.fetchall()
     return result
 
-def IdOldRestaurant(idList):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
+def selectYoutuber():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE old_restaurant.id IN (1428, 732, 133, 596, 828, 1080, 1189, 1000, 987, 764, 129, 814, 66, 806, 369, 1104, 1265, 646, 1380, 941, 386)"
+        cursor.execute(sql)
 
-    sql = f"SELECT * FROM nopo_db.old_restaurant WHERE id in {idList}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    # df = pd.DataFrame(result)
+        result = cursor.fetchall()
     return result
 
-def aztiRestaurants(text):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
+def selectLikedCount():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT COUNT(*) AS cnt, MAX(id) AS max_id FROM nopo_db.liked"""
+        cursor.execute(sql)
 
-    sql = f"SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id WHERE {text}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    # df = pd.DataFrame(result)
+        result = cursor.fetchall()
     return result
 
-def selectOneRestaurant(restoId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
+def selectLikedAfter(likedId, maxId):
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT id, resto_id FROM nopo_db.liked WHERE id > %s AND id <= %s ORDER BY id"""
+        cursor.execute(sql, (likedId, maxId))
 
-    sql = f"SELECT * FROM old_restaurant WHERE id = {restoId}"
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    # df = pd.DataFrame(result)
+        result = cursor.fetchall()
     return result
 
-def selectOldRestaurant():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = """SELECT id, resto_name FROM old_restaurant"""
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    df = pd.DataFrame(result)
-    return df
-
-def selectOldAllRestaurant():
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = """SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id"""
-    cursor.execute(sql)
-    
-    result = cursor.fetchall()
-    connection.close()
-    df = pd.DataFrame(result)
-    return df
+def selectCollectionVersion():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT (SELECT COUNT(*) FROM nopo_db.liked) AS liked_cnt, (SELECT MAX(id) FROM nopo_db.liked) AS liked_max_id, (SELECT COUNT(*) FROM review) AS review_cnt, (SELECT MAX(id) FROM review) AS review_max_id"""
+        cursor.execute(sql)
+
+        result = cursor.fetchall()[0]
+    return (result['liked_cnt'], result['liked_max_id'], result['review_cnt'], result['review_max_id'])
+
+def selectCatalog():
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        # old_restaurant 컬럼 이름 (JOIN 결과에서 노포 컬럼만 골라낼 때 사용)
+        cursor.execute("""SELECT * FROM old_restaurant LIMIT 0""")
+        restaurant_columns = [column[0] for column in cursor.description]
+
+        sql = """SELECT * FROM old_restaurant LEFT OUTER JOIN element ON old_restaurant.ele_id = element.id ORDER BY old_restaurant.id"""
+        cursor.execute(sql)
+
+        result = cursor.fetchall()
+    return result, restaurant_columns
+
+def selectCatalogVersion():
+    # 행 수와 max(id) 는 추가/삭제, information_schema 의 UPDATE_TIME 은 행 수정을 잡는다 (테이블을 읽지 않는 싼 확인)
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        # MySQL 8 은 information_schema 통계를 기본 하루 캐시하므로 이 세션에서는 끈다 (5.7 에는 없는 변수)
+        try:
+            cursor.execute("""SET SESSION information_schema_stats_expiry = 0""")
+        except pymysql.err.OperationalError:
+            pass
+        sql = """SELECT (SELECT COUNT(*) FROM old_restaurant) AS cnt, (SELECT MAX(id) FROM old_restaurant) AS max_id, (SELECT COUNT(*) FROM element) AS ele_cnt, (SELECT MAX(id) FROM element) AS ele_max_id"""
+        cursor.execute(sql)
+        version = cursor.fetchall()[0]
+
+        sql = """SELECT TABLE_NAME, UPDATE_TIME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN ('old_restaurant', 'element') ORDER BY TABLE_NAME"""
+        cursor.execute(sql)
+        update_times = cursor.fetchall()
+    return (version['cnt'], version['max_id'], version['ele_cnt'], version['ele_max_id']) + tuple(str(row['UPDATE_TIME']) for row in update_times)
 
 def selectVisitedRestos(userId):
-    connection, cursor = connectMySQL()
-    cursor = connection.cursor()
-    sql = """SELECT resto_id FROM visited where user_id like %s"""
-    cursor.execute(sql, (userId))
-    
-    result = cursor.fetchall()
-    connection.close()
-    df = pd.DataFrame(result)
-    return df
-
-def getSvdPred():
-    review_data = selectReview()
-    resto_data = selectOldRestaurant()
-    # user_resto_rating = pd.merge(review_data, resto_data, left_on="resto_id", right_on="id")
+    with mysqlConnection() as connection:
+        cursor = connection.cursor()
+        sql = """SELECT resto_id FROM visited where user_id like %s"""
+        cursor.execute(sql, (userId))
 
-    # make pivot table
-    user_resto_rating = review_data.pivot_table(index="user_id", columns="resto_id", values="rating").fillna(0)
-    # pivot table to numpy matrix
-    matrix = user_resto_rating.to_numpy()
-    user_ratings_mean = np.mean(matrix, axis=1)
-    # 사용자-영화에 사용자 평균평점 빼기
-    matrix_user_mean = matrix - user_ratings_mean.reshape(-1, 1)
-
-    # svd
-    U, sigma, Vt = svds(matrix_user_mean, k=1)
-    # 0이 포함된 대칭행렬로 변환
-    sigma = np.diag(sigma)
-    # 다시 원본 행렬로 복원
-    svd_user_predicted_ratings = np.dot(np.dot(U,sigma), Vt) + user_ratings_mean.reshape(-1, 1)
-    # 사용자 평균평점 다시 더해주기
-    df_svd_preds = pd.DataFrame(svd_user_predicted_ratings, columns=user_resto_rating.columns, index=user_resto_rating.index)
-
-    return df_svd_preds
+        result = cursor.fetchall()
+    df = pd.DataFrame(result, columns=['resto_id'])
+    return df
 
 def makeReviewRestoVector():
     review_data = selectReview()
     resto_data = selectOldRestaurant()
-    user_resto_rating = pd.merge(review_data, resto_data, left_on="resto_id", right_on="id", how="outer")
-
-    # make pivot table
-    resto_user_rating = user_resto_rating.pivot_table('rating', index="id", columns="user_id")
-    user_resto_rating = user_resto_rating.pivot_table('rating', index="user_id", columns="resto_id")
-
-    # NaN to null
-    resto_user_rating.fillna(0, inplace=True)
-
-    # cosine similarity
-    item_based_collab = cosine_similarity(resto_user_rating)
-    item_based_collab = pd.DataFrame(data = item_based_collab, index=resto_user_rating.index, columns=resto_user_rating.index)
-    return item_based_collab
-
-
-def mfRecomm(userId):
-    resto_data = selectOldRestaurant()
-    visited_data = selectVisitedRestos(userId)
-    # userId 기준으로 평점 높은 순으로 정렬
-    sorted_user_prediction = getSvdPred().loc[userId].sort_values(ascending=False)
-    # review data에서 userId의 정보 가져오기
-    user_data = selectReviewByUserId(userId)
-    # user_data와 노포 데이터 합치기
-    user_history = user_data.merge(resto_data, left_on='resto_id', right_on='id').sort_values(['rating'], ascending=False)
-    # 원본 노포 데이터에서 리뷰 남긴 곳 제외
-    recommendation = resto_data[~resto_data['id'].isin(user_history['resto_id'])]
-    # 가본 곳 제외
-    recommendation = resto_data[~resto_data['id'].isin(visited_data['resto_id'])]
-    # 평점 높은 순으로 정렬한 데이터와 합치기
-    recommendation = recommendation.merge(pd.DataFrame(sorted_user_prediction).reset_index(), left_on='id', right_on='resto_id')
-    sort_column = recommendation.columns[-1]
-    recommendation = recommendation.sort_values(by=sort_column, ascending=False)
-    result = recommendation['id'][:10]
-    return result
-
-def getItemBasedCF(restoId):
-    return makeReviewRestoVector()[restoId].sort_values(ascending=False)[1:16]
-
+    # 사용자 x 노포 희소 평점 행렬 (리뷰가 있는 노포만, pivot_table 과 같음)
+    resto_ids = np.sort(resto_data['id'][resto_data['id'].isin(review_data['resto_id'])].to_numpy())
+    return RatingMatrix(review_data, resto_ids=resto_ids)
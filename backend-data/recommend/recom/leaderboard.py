@@ -0,0 +1,78 @@
+import math
+import time
+
+from recommend.recom.knn import selectLikedAfter, selectLikedCount
+from recommend.recom.service import WatermarkStore
+
+
+class LikedLeaderboard(WatermarkStore):
+    # 노포별 좋아요 수와 시간 감쇠 인기 점수를 메모리에 들고 있는 순위표 (liked.id 워터마크, 개수가 안 맞으면 = 좋아요 취소).
+    # liked 에는 시각이 없어서 좋아요 시각은 처음 읽은 시각으로 본다 (처음 적재한 좋아요는 모두 적재 시각)
+    name = 'Liked leaderboard'
+
+    def __init__(self, half_life=7 * 24 * 60 * 60, check_interval=30, full_reload_interval=60 * 60):
+        super().__init__(check_interval, full_reload_interval)
+        self.decay = math.log(2) / half_life
+
+        # (counts, ranking, scores, trend_ranking, epoch). 읽는 쪽이 한 번에 같은 판을 보도록 통째로 바꾼다
+        self.board = ({}, [], {}, [], 0)
+        self.epoch = 0
+
+        # liked.id -> (resto_id, 처음 읽은 시각). 새로 고침 스레드에서만 고친다
+        self._like_times = {}
+
+    def selectCount(self):
+        return selectLikedCount()
+
+    def selectAfter(self, likedId, maxId):
+        return selectLikedAfter(likedId, maxId)
+
+    def _weight(self, seen_at):
+        # exp(-decay * (now - seen_at)) 를 epoch 기준으로 저장 (순위는 now 와 무관)
+        return math.exp(self.decay * (seen_at - self.epoch))
+
+    def _publish(self, counts, scores):
+        ranking = sorted(counts, key=lambda restoId: (-counts[restoId], restoId))
+        trend_ranking = sorted(scores, key=lambda restoId: (-scores[restoId], restoId))
+        self.board = (counts, ranking, scores, trend_ranking, self.epoch)
+
+    def load(self, rows):
+        now = time.time()
+        like_times = {row['id']: (row['resto_id'], self._like_times.get(row['id'], (None, now))[1]) for row in rows}
+        # 다시 집계할 때마다 epoch 를 옮겨서 가중치가 넘치지 않게 한다
+        self.epoch = now
+        counts, scores = {}, {}
+        for restoId, seen_at in like_times.values():
+            counts[restoId] = counts.get(restoId, 0) + 1
+            scores[restoId] = scores.get(restoId, 0.0) + self._weight(seen_at)
+
+        self._like_times = like_times
+        self._publish(counts, scores)
+
+    def append(self, rows):
+        now = time.time()
+        weight = self._weight(now)
+        counts, _, scores, _, _ = self.board
+        counts, scores = dict(counts), dict(scores)
+        for row in rows:
+            restoId = row['resto_id']
+            self._like_times[row['id']] = (restoId, now)
+            counts[restoId] = counts.get(restoId, 0) + 1
+            scores[restoId] = scores.get(restoId, 0.0) + weight
+        self._publish(counts, scores)
+
+    def top(self, n=20):
+        # 좋아요 많은 순 (resto_id, 좋아요 수)
+        self._ensureLoaded()
+        counts, ranking, _, _, _ = self.board
+        return [(restoId, counts[restoId]) for restoId in ranking[:n]]
+
+    def trending(self, n=20, now=None):
+        # 최근 좋아요일수록 크게 센 인기 순 (resto_id, 지금 기준 감쇠된 좋아요 수)
+        self._ensureLoaded()
+        _, _, scores, trend_ranking, epoch = self.board
+        scale = math.exp(-self.decay * ((time.time() if now is None else now) - epoch))
+        return [(restoId, scores[restoId] * scale) for restoId in trend_ranking[:n]]
+
+
+likedLeaderboard = LikedLeaderboard()
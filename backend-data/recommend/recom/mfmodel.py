@@ -0,0 +1,52 @@
+import time
+
+import pandas as pd
+from scipy.sparse.linalg import svds
+
+from recommend.recom.ratingmatrix import RatingMatrix
+from recommend.recom.knn import selectReview, selectVisitedRestos
+from recommend.recom.catalog import getCatalog
+from recommend.recom.service import ReviewModelService
+
+
+class MfModel:
+    # 예측 행렬 전체 대신 U, sigma, Vt 만 들고 있다가 필요한 사용자 한 명만 계산
+    def __init__(self, review_data, k=1):
+        # 희소 평점 행렬에서 사용자 평균평점을 뺀 행렬로 svd
+        rating_matrix = RatingMatrix(review_data)
+        matrix_user_mean, self.user_ratings_mean = rating_matrix.userCentered()
+        self.U, self.sigma, self.Vt = svds(matrix_user_mean, k=k)
+
+        self.user_index = {str(user_id): row for row, user_id in enumerate(rating_matrix.user_ids)}
+        self.resto_ids = rating_matrix.resto_ids
+        self.review_count = rating_matrix.review_count
+        self.trained_at = time.time()
+
+    def predict(self, userId):
+        row = self.user_index.get(str(userId))
+        if row is None:
+            return None
+
+        # U[row] * sigma 를 Vt 에 곱하고 사용자 평균평점 다시 더해주기
+        predicted = (self.U[row] * self.sigma) @ self.Vt + self.user_ratings_mean[row]
+        return pd.Series(predicted, index=pd.Index(self.resto_ids, name='resto_id'), name='prediction')
+
+
+mfService = ReviewModelService('MF model', lambda: MfModel(selectReview()))
+
+def mfRecomm(userId):
+    model = mfService.getModel()
+    # userId 기준 예측 평점 (모델이 아직 없거나 리뷰가 없는 사용자는 빈 결과)
+    user_prediction = model.predict(userId) if model is not None else None
+    if user_prediction is None:
+        return pd.Series([], name='id', dtype='int64')
+
+    resto_data = getCatalog().frame(['id', 'resto_name'])
+    visited_data = selectVisitedRestos(userId)
+    # 가본 곳 제외 (리뷰는 가본 곳에만 남길 수 있다)
+    recommendation = resto_data[~resto_data['id'].isin(visited_data['resto_id'])]
+    # 평점 높은 순으로 정렬한 데이터와 합치기
+    recommendation = recommendation.merge(user_prediction.reset_index(), left_on='id', right_on='resto_id')
+    recommendation = recommendation.sort_values(by='prediction', ascending=False)
+    result = recommendation['id'][:10]
+    return result
@@ -0,0 +1,60 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from recommend.recom.knn import makeReviewRestoVector
+from recommend.recom.service import ReviewModelService
+
+
+class ItemNeighbors:
+    # 노포마다 아이템 기반 CF 상위 k개 이웃을 미리 계산해 둔 표 (행 = 노포, 열 = 순위)
+    def __init__(self, rating_matrix, k=15, block_size=512):
+        item_vectors = rating_matrix.itemVectors()
+        n = item_vectors.shape[0]
+        k = max(min(k, n - 1), 0)
+
+        self.resto_ids = np.asarray(rating_matrix.resto_ids)
+        self.resto_index = dict(rating_matrix.resto_index)
+        self.neighbor_rows = np.zeros((n, k), dtype=np.int32)
+        self.neighbor_scores = np.zeros((n, k), dtype=np.float32)
+        self.review_count = rating_matrix.review_count
+        self.trained_at = time.time()
+
+        if k == 0:
+            return
+
+        # N x N 유사도 행렬을 한 번에 만들지 않도록 block_size 행씩 계산
+        for start in range(0, n, block_size):
+            stop = min(start + block_size, n)
+            block = (item_vectors[start:stop] @ item_vectors.T).toarray()
+            # 자기 자신은 제외
+            block[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+
+            self.neighbor_rows[start:stop] = np.take_along_axis(top, order, axis=1)
+            self.neighbor_scores[start:stop] = np.take_along_axis(top_scores, order, axis=1)
+
+    def neighbors(self, restoId):
+        row = self.resto_index[restoId]
+        return pd.Series(
+            self.neighbor_scores[row].astype(np.float64),
+            index=pd.Index(self.resto_ids[self.neighbor_rows[row]], name='id'),
+            name=restoId,
+        )
+
+
+def buildItemNeighbors():
+    return ItemNeighbors(makeReviewRestoVector())
+
+neighborService = ReviewModelService('Item neighbor table', buildItemNeighbors)
+
+def getItemBasedCF(restoId):
+    # 미리 계산한 표에서 읽기만 한다. 표가 아직 없거나 리뷰 없는 노포면 KeyError
+    table = neighborService.getModel()
+    if table is None:
+        raise KeyError(restoId)
+    return table.neighbors(restoId)
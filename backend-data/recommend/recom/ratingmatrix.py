@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+from sklearn.preprocessing import normalize
+
+
+class RatingMatrix:
+    # (user_id, resto_id, rating) 행에서 바로 만드는 사용자 x 노포 희소 평점 행렬 (CSR)
+    def __init__(self, review_data, resto_ids=None):
+        # 같은 사용자가 같은 노포에 여러 번 남긴 평점은 pivot_table 처럼 평균
+        ratings = review_data.groupby(['user_id', 'resto_id'], sort=False)['rating'].mean().reset_index()
+
+        self.user_ids = np.sort(pd.unique(ratings['user_id']))
+        if resto_ids is None:
+            self.resto_ids = np.sort(pd.unique(ratings['resto_id']))
+        else:
+            self.resto_ids = pd.unique(pd.Series(resto_ids).dropna())
+        self.user_index = {user_id: row for row, user_id in enumerate(self.user_ids)}
+        self.resto_index = {resto_id: col for col, resto_id in enumerate(self.resto_ids)}
+
+        # 노포 목록에 없는 노포의 평점은 버린다 (outer merge 후 pivot 했을 때와 같음)
+        rows = pd.Index(self.user_ids).get_indexer(ratings['user_id'])
+        cols = pd.Index(self.resto_ids).get_indexer(ratings['resto_id'])
+        known = (rows >= 0) & (cols >= 0)
+
+        self.matrix = csr_matrix(
+            (ratings['rating'].to_numpy(dtype=np.float64)[known], (rows[known], cols[known])),
+            shape=(len(self.user_ids), len(self.resto_ids)),
+        )
+        self.review_count = len(review_data)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    def userCentered(self):
+        # 빈 칸을 0으로 본 사용자 평균평점을 뺀 행렬을 밀집 행렬로 만들지 않고 LinearOperator 로 표현
+        matrix = self.matrix
+        n_users, n_restos = matrix.shape
+        user_ratings_mean = np.asarray(matrix.sum(axis=1)).ravel() / n_restos
+
+        def matvec(x):
+            x = np.asarray(x).ravel()
+            return matrix @ x - user_ratings_mean * x.sum()
+
+        def rmatvec(y):
+            y = np.asarray(y).ravel()
+            return matrix.T @ y - np.full(n_restos, user_ratings_mean @ y)
+
+        def matmat(X):
+            return matrix @ X - np.outer(user_ratings_mean, X.sum(axis=0))
+
+        def rmatmat(Y):
+            return matrix.T @ Y - np.outer(np.ones(n_restos), user_ratings_mean @ Y)
+
+        operator = LinearOperator(
+            (n_users, n_restos), matvec=matvec, rmatvec=rmatvec,
+            matmat=matmat, rmatmat=rmatmat, dtype=np.float64,
+        )
+        return operator, user_ratings_mean
+
+    def itemVectors(self):
+        # 노포 x 사용자 행렬을 L2 정규화 (내적 = 코사인 유사도)
+        return normalize(self.matrix.T.tocsr(), norm='l2')
+
+    def itemSimilarity(self, restoId):
+        item_vectors = self.itemVectors()
+        col = self.resto_index[restoId]
+        similarity = (item_vectors @ item_vectors[col].T).toarray().ravel()
+        return pd.Series(similarity, index=pd.Index(self.resto_ids, name='id'), name=restoId)
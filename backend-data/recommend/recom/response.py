@@ -0,0 +1,90 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+
+import numpy as np
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 이보다 작은 응답은 압축하지 않는다
+MIN_COMPRESS_SIZE = 1024
+
+def _default(value):
+    # DictCursor 의 avg(rating) 같은 Decimal, numpy 값, (json 모듈일 때) 날짜
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def dumps(data):
+    if orjson is not None:
+        return orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, ensure_ascii=False).encode()
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+def acceptedEncoding(request):
+    if request is None:
+        return None
+    accepted = set()
+    for token in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = token.partition(';')
+        params = params.replace(' ', '')
+        try:
+            # q=0 은 받지 않겠다는 뜻
+            if params.startswith('q=') and float(params[2:]) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(name.strip().lower())
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+class JsonPayload:
+    # 직렬화한 응답 본문. 압축본은 처음 요청될 때 한 번만 만들어 둔다
+    def __init__(self, body):
+        self.body = body
+        self._encoded = {}
+
+    def encoded(self, encoding):
+        body = self._encoded.get(encoding)
+        if body is None:
+            body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+def payloadResponse(payload, request=None, status=200):
+    encoding = acceptedEncoding(request) if len(payload.body) >= MIN_COMPRESS_SIZE else None
+    response = HttpResponse(payload.body if encoding is None else payload.encoded(encoding), content_type='application/json', status=status)
+    if encoding is not None:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+def jsonResponse(data, request=None, status=200):
+    return payloadResponse(JsonPayload(dumps(data)), request, status)
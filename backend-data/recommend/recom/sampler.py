@@ -0,0 +1,46 @@
+import random
+import threading
+
+import numpy as np
+
+from recommend.recom.catalog import getCatalog
+
+_random = random.Random()
+
+
+class RestoSampler:
+    # ORDER BY RAND() 대신 등급별 행 번호 배열에서 중복 없이 k개를 뽑는다
+    def __init__(self, catalog):
+        self.version = catalog.version
+        self.segments = {None: np.arange(len(catalog))}
+
+        grades = np.asarray(catalog.columns.get('grade', [None] * len(catalog)), dtype=object)
+        for grade in dict.fromkeys(grades):
+            if grade is not None:
+                self.segments[grade] = np.flatnonzero(grades == grade)
+
+    def sample(self, k, grade=None, seed=None):
+        rows = self.segments.get(grade, self.segments[None][:0])
+        rng = _random if seed is None else random.Random(seed)
+        # range 에서 뽑으면 O(k)
+        picks = rng.sample(range(len(rows)), min(k, len(rows)))
+        return rows[picks]
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+def getSampler(catalog=None):
+    global _sampler
+    catalog = getCatalog() if catalog is None else catalog
+    sampler = _sampler
+    if sampler is None or sampler.version != catalog.version:
+        with _sampler_lock:
+            sampler = _sampler
+            if sampler is None or sampler.version != catalog.version:
+                sampler = _sampler = RestoSampler(catalog)
+    return sampler
+
+def randomRestos(k, grade=None, seed=None, joined=False):
+    catalog = getCatalog()
+    return catalog.rows(getSampler(catalog).sample(k, grade, seed), joined)
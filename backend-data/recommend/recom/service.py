@@ -0,0 +1,183 @@
+import logging
+import threading
+import time
+
+from recommend.recom.knn import selectReviewCount
+
+logger = logging.getLogger(__name__)
+
+# gunicorn 마스터처럼 요청을 받지 않는 프로세스에서는 백그라운드 새로 고침 스레드를 띄우지 않는다.
+# (fork 하는 순간 그 스레드가 DB 커넥션이나 잠금을 잡고 있으면 워커가 그대로 물려받는다)
+_refresh_paused = False
+
+def pauseRefresh(paused=True):
+    global _refresh_paused
+    _refresh_paused = paused
+
+
+class ModelService:
+    # 메모리에 올려두는 모델/캐시 공용 관리자.
+    # 요청은 항상 지금 가지고 있는 모델로 바로 응답하고, 재학습은 백그라운드 스레드에서만 한다
+    def __init__(self, name, build, check_interval=60):
+        self.name = name
+        self.build = build
+        self.check_interval = check_interval
+
+        self.model = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._training = False
+        self._last_check = 0
+
+    def getModel(self, wait=False):
+        # wait=True 면 아직 모델이 없을 때 처음 한 번만 직접 만든다
+        if wait and self.model is None:
+            with self._build_lock:
+                if self.model is None:
+                    self.train()
+            return self.model
+
+        self.refreshAsync()
+        return self.model
+
+    def refreshAsync(self, force=False):
+        if _refresh_paused:
+            return False
+        now = time.time()
+        with self._lock:
+            if self._training:
+                return False
+            if not force and self.model is not None and now - self._last_check < self.check_interval:
+                return False
+            self._training = True
+            self._last_check = now
+
+        threading.Thread(target=self._refresh, args=(force,), daemon=True).start()
+        return True
+
+    def afterFork(self):
+        # fork 된 자식 프로세스에는 백그라운드 스레드가 따라오지 않으므로 잠금과 상태를 새로 만든다
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._training = False
+
+    def needsTraining(self):
+        return self.model is None
+
+    def train(self):
+        model = self.build()
+        self.model = model
+        # 방금 만들었으니 check_interval 동안은 다시 확인하지 않는다
+        self._last_check = time.time()
+        return model
+
+    def _refresh(self, force):
+        try:
+            if force or self.needsTraining():
+                with self._build_lock:
+                    self.train()
+        except Exception:
+            logger.exception('%s training failed', self.name)
+        finally:
+            with self._lock:
+                self._training = False
+
+
+class ReviewModelService(ModelService):
+    # 리뷰로 학습하는 모델. build() 가 돌려주는 모델은 review_count, trained_at 을 가지고 있어야 한다
+    def __init__(self, name, build, min_new_reviews=10, max_age=60 * 60, check_interval=60):
+        super().__init__(name, build, check_interval)
+        self.min_new_reviews = min_new_reviews
+        self.max_age = max_age
+
+    def needsTraining(self):
+        if self.model is None:
+            return True
+        if time.time() - self.model.trained_at >= self.max_age:
+            return True
+        review_count = selectReviewCount()[0]['cnt']
+        return abs(review_count - self.model.review_count) >= self.min_new_reviews
+
+
+class WatermarkStore:
+    # id 워터마크 이후 행만 읽어서 더하는 메모리 집계 공용 틀.
+    # 개수가 안 맞거나(삭제) full_reload_interval 이 지나면(수정) 처음부터 다시 집계한다.
+    # 하위 클래스는 selectCount() -> [{'cnt', 'max_id'}], selectAfter(afterId, maxId), load(rows), append(rows) 를 구현
+    name = 'store'
+
+    def __init__(self, check_interval=30, full_reload_interval=60 * 60):
+        self.check_interval = check_interval
+        self.full_reload_interval = full_reload_interval
+
+        self.watermark = 0
+        self.row_count = 0
+        self.loaded_at = 0
+
+        self._lock = threading.Lock()
+        # 백그라운드 갱신과 다른 모델을 만들기 전의 동기 갱신이 겹치지 않게
+        self._refresh_lock = threading.RLock()
+        self._refreshing = False
+        self._last_check = 0
+
+    def reload(self):
+        with self._refresh_lock:
+            stat = self.selectCount()[0]
+            max_id = stat['max_id'] or 0
+            rows = self.selectAfter(0, max_id)
+            self.load(rows)
+
+            self.watermark, self.row_count = max_id, len(rows)
+            self.loaded_at = self._last_check = time.time()
+
+    def refresh(self):
+        with self._refresh_lock:
+            if self.loaded_at == 0 or time.time() - self.loaded_at >= self.full_reload_interval:
+                self.reload()
+                return
+
+            # 개수와 max(id) 를 먼저 읽고 그 사이의 행만 가져오면, 개수가 안 맞을 때는 삭제가 있었던 것
+            stat = self.selectCount()[0]
+            max_id = stat['max_id'] or 0
+
+            if max_id > self.watermark:
+                rows = self.selectAfter(self.watermark, max_id)
+                self.append(rows)
+                self.watermark, self.row_count = max_id, self.row_count + len(rows)
+
+            if stat['cnt'] != self.row_count:
+                self.reload()
+
+    def refreshAsync(self):
+        if _refresh_paused:
+            return False
+        now = time.time()
+        with self._lock:
+            if self._refreshing or now - self._last_check < self.check_interval:
+                return False
+            self._refreshing = True
+            self._last_check = now
+
+        threading.Thread(target=self._refresh, daemon=True).start()
+        return True
+
+    def _refresh(self):
+        try:
+            self.refresh()
+        except Exception:
+            logger.exception('%s refresh failed', self.name)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def afterFork(self):
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.RLock()
+        self._refreshing = False
+
+    def _ensureLoaded(self):
+        if self.loaded_at == 0:
+            with self._lock:
+                if self.loaded_at == 0:
+                    self.reload()
+        else:
+            self.refreshAsync()
@@ -0,0 +1,144 @@
+import math
+import os
+import threading
+
+import numpy as np
+from sklearn.neighbors import BallTree
+
+from recommend.recom.catalog import getCatalog
+from recommend.recom.tiles import TILE_PRECISION, TileCache, coveringTiles, tileCount, tileGeohash, tileSize
+
+EARTH_RADIUS = 6371.0088  # km
+
+# 기존 /resto/location 검색 범위 (위도, 경도 각각 ±0.054도)
+BOX_SIZE = 0.054
+
+def haversine(lat1, lng1, lat2, lng2):
+    # 두 좌표 사이 거리 (km), numpy 배열도 가능
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    # 노포 좌표(location_x = 경도, location_y = 위도)에 대한 haversine BallTree
+    def __init__(self, catalog):
+        self.version = catalog.version
+
+        lng = catalog.array('location_x')
+        lat = catalog.array('location_y')
+        # 좌표가 없는 노포는 위치 검색에서 빠진다
+        self.rows = np.flatnonzero(~(np.isnan(lng) | np.isnan(lat)))
+        self.lng = lng[self.rows]
+        self.lat = lat[self.rows]
+        self.tree = BallTree(np.radians(np.column_stack([self.lat, self.lng])), metric='haversine') if len(self.rows) else None
+
+        # 노포마다 geohash 타일 번호 (tiles.tileOf 와 같은 계산)
+        width, height = tileSize(TILE_PRECISION)
+        self.tile_i = np.floor((self.lng + 180.0) / width).astype(np.int64)
+        self.tile_j = np.floor((self.lat + 90.0) / height).astype(np.int64)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _point(self, locx, locy):
+        return np.radians([[locy, locx]])
+
+    def nearest(self, locx, locy, k):
+        # 가까운 순서로 k개 (catalog 행 번호, 거리 km)
+        k = min(int(k), len(self))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        dist, ind = self.tree.query(self._point(locx, locy), k=k)
+        return self.rows[ind[0]], dist[0] * EARTH_RADIUS
+
+    def radius(self, locx, locy, radius):
+        # 반경 radius km 안의 노포를 가까운 순서로
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        ind, dist = self.tree.query_radius(self._point(locx, locy), r=radius / EARTH_RADIUS, return_distance=True, sort_results=True)
+        return self.rows[ind[0]], dist[0] * EARTH_RADIUS
+
+    def tile(self, tile):
+        # 타일 안의 노포 (catalog 행 번호, 경도, 위도)
+        i, j = tile
+        members = np.flatnonzero((self.tile_i == i) & (self.tile_j == j))
+        return self.rows[members], self.lng[members], self.lat[members]
+
+
+_spatial_index = None
+_spatial_lock = threading.Lock()
+
+def getSpatialIndex(catalog=None):
+    global _spatial_index
+    catalog = getCatalog() if catalog is None else catalog
+    index = _spatial_index
+    if index is None or index.version != catalog.version:
+        with _spatial_lock:
+            index = _spatial_index
+            if index is None or index.version != catalog.version:
+                index = _spatial_index = SpatialIndex(catalog)
+    return index
+
+tileCache = TileCache(
+    maxsize=int(os.environ.get('LOCATION_TILE_CACHE_SIZE', 1024)),
+    ttl=float(os.environ.get('LOCATION_TILE_TTL', 10 * 60)),
+)
+
+# 반경 검색이 이보다 많은 타일을 덮으면 (50km 면 546개) 캐시를 밀어내지 않도록 BallTree 로 바로 찾는다
+MAX_RADIUS_TILES = int(os.environ.get('LOCATION_MAX_RADIUS_TILES', 64))
+
+def viewportRestos(catalog, index, tiles):
+    # geohash 타일들을 캐시에서 꺼내 이어 붙인다
+    parts = [
+        tileCache.get(catalog.version, tileGeohash(tile), lambda tile=tile: index.tile(tile))
+        for tile in tiles
+    ]
+    if not parts:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    return tuple(np.concatenate(values) for values in zip(*parts))
+
+def sortByDistance(rows, dist, mask):
+    rows, dist = rows[mask], dist[mask]
+    order = np.lexsort((rows, dist))
+    return rows[order], dist[order]
+
+def boxRestos(catalog, index, locx, locy, size=BOX_SIZE):
+    # 기존 SQL 과 같은 위경도 사각형 (경계 제외)
+    rows, lng, lat = viewportRestos(catalog, index, coveringTiles(locx - size, locx + size, locy - size, locy + size))
+    inside = (lng > locx - size) & (lng < locx + size) & (lat > locy - size) & (lat < locy + size)
+    return sortByDistance(rows, haversine(locy, locx, lat, lng), inside)
+
+def radiusRestos(catalog, index, locx, locy, radius):
+    dlat = math.degrees(radius / EARTH_RADIUS)
+    dlng = dlat / max(math.cos(math.radians(locy)), 1e-6)
+    bounds = (locx - dlng, locx + dlng, locy - dlat, locy + dlat)
+    if not math.isfinite(dlng) or tileCount(*bounds) > MAX_RADIUS_TILES:
+        rows, dist = index.radius(locx, locy, radius)
+        return sortByDistance(rows, dist, np.ones(len(rows), dtype=bool))
+    rows, lng, lat = viewportRestos(catalog, index, coveringTiles(*bounds))
+    dist = haversine(locy, locx, lat, lng)
+    return sortByDistance(rows, dist, dist <= radius)
+
+def locationRestos(locx, locy, k=None, radius=None, page=None, size=None):
+    # k 가 있으면 최근접 k개, radius(km) 가 있으면 반경 검색, 둘 다 없으면 기존 사각형 범위
+    catalog = getCatalog()
+    index = getSpatialIndex(catalog)
+    if k is not None:
+        rows, dist = index.nearest(locx, locy, k)
+        if radius is not None:
+            rows, dist = rows[dist <= radius], dist[dist <= radius]
+    elif radius is not None:
+        rows, dist = radiusRestos(catalog, index, locx, locy, radius)
+    else:
+        rows, dist = boxRestos(catalog, index, locx, locy)
+
+    total = len(rows)
+    if size is not None:
+        start = (page or 0) * size
+        rows, dist = rows[start:start + size], dist[start:start + size]
+
+    result = catalog.rows(rows)
+    for item, distance in zip(result, dist):
+        item['distance'] = round(float(distance), 4)
+    return result, total
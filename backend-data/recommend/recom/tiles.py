@@ -0,0 +1,95 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+# geohash 5자리 = 약 4.9km x 4.9km (서울 기준), 기존 ±0.054도 범위는 3x3 ~ 4x4 타일
+TILE_PRECISION = 5
+
+def tileSize(precision=TILE_PRECISION):
+    # (경도 폭, 위도 폭) 도 단위
+    bits = precision * 5
+    return 360.0 / (1 << ((bits + 1) // 2)), 180.0 / (1 << (bits // 2))
+
+def tileOf(lng, lat, precision=TILE_PRECISION):
+    width, height = tileSize(precision)
+    return int(math.floor((lng + 180.0) / width)), int(math.floor((lat + 90.0) / height))
+
+def tileBounds(tile, precision=TILE_PRECISION):
+    # (서, 동, 남, 북)
+    width, height = tileSize(precision)
+    i, j = tile
+    return i * width - 180.0, (i + 1) * width - 180.0, j * height - 90.0, (j + 1) * height - 90.0
+
+def tileGeohash(tile, precision=TILE_PRECISION):
+    # 경도 비트부터 번갈아 섞어 5비트씩 base32 로
+    bits = precision * 5
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    i, j = tile
+    code = 0
+    for n in range(bits):
+        if n % 2 == 0:
+            lng_bits -= 1
+            code = code * 2 + ((i >> lng_bits) & 1)
+        else:
+            lat_bits -= 1
+            code = code * 2 + ((j >> lat_bits) & 1)
+    return ''.join(BASE32[(code >> shift) & 31] for shift in range(bits - 5, -1, -5))
+
+def coveringTiles(min_x, max_x, min_y, max_y, precision=TILE_PRECISION):
+    min_i, min_j = tileOf(min_x, min_y, precision)
+    max_i, max_j = tileOf(max_x, max_y, precision)
+    return [(i, j) for i in range(min_i, max_i + 1) for j in range(min_j, max_j + 1)]
+
+def tileCount(min_x, max_x, min_y, max_y, precision=TILE_PRECISION):
+    # coveringTiles 의 개수 (목록을 만들지 않는다)
+    min_i, min_j = tileOf(min_x, min_y, precision)
+    max_i, max_j = tileOf(max_x, max_y, precision)
+    return max(max_i - min_i + 1, 0) * max(max_j - min_j + 1, 0)
+
+
+class TileCache:
+    # geohash 타일별 결과를 담아두는 TTL + LRU 캐시. 노포 목록 버전이 바뀌면 전부 비운다
+    def __init__(self, maxsize=1024, ttl=10 * 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, version, key, build):
+        now = time.time()
+        with self._lock:
+            if version != self.version:
+                self._tiles.clear()
+                self.version = version
+            entry = self._tiles.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        # 만드는 동안은 잠그지 않는다 (같은 타일을 두 번 만들어도 결과는 같다)
+        value = build()
+        with self._lock:
+            if version == self.version:
+                self._tiles[key] = (now, value)
+                self._tiles.move_to_end(key)
+                while len(self._tiles) > self.maxsize:
+                    self._tiles.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._tiles.clear()
+            self.version = None
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._tiles), 'maxsize': self.maxsize}
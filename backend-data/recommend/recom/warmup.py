@@ -0,0 +1,91 @@
+import logging
+import threading
+
+from recommend.recom.aggregates import ratingAggregates
+from recommend.recom.azti import getAztiIndex
+from recommend.recom.catalog import catalogService
+from recommend.recom.cbfmodel import getCbfModel
+from recommend.recom.coldstart import aztiRecommService
+from recommend.recom.curated import curatedService
+from recommend.recom.database import pool
+from recommend.recom.leaderboard import likedLeaderboard
+from recommend.recom.mfmodel import mfService
+from recommend.recom.neighbors import neighborService
+from recommend.recom.service import pauseRefresh
+from recommend.recom.sampler import getSampler
+from recommend.recom.spatial import getSpatialIndex
+
+logger = logging.getLogger(__name__)
+
+services = [catalogService, mfService, neighborService, aztiRecommService, curatedService]
+stores = [ratingAggregates, likedLeaderboard]
+
+def warmUp(force=False):
+    # 노포 목록 -> 목록에서 만드는 색인 -> 리뷰 모델 -> 집계 -> 홈 화면 목록 순으로 전부 메모리에 올린다.
+    # gunicorn preload 면 마스터에서 한 번 만들고 워커들이 copy-on-write 로 같이 쓴다
+    for service in (catalogService, mfService, neighborService):
+        if force or service.model is None:
+            with service._build_lock:
+                service.train()
+
+    catalog = catalogService.model
+    getCbfModel(catalog)
+    getAztiIndex(catalog)
+    getSpatialIndex(catalog)
+    getSampler(catalog)
+    if force or aztiRecommService.model is None:
+        with aztiRecommService._build_lock:
+            aztiRecommService.train()
+
+    for store in stores:
+        if force or store.loaded_at == 0:
+            store.reload()
+
+    if force or curatedService.model is None:
+        with curatedService._build_lock:
+            curatedService.train()
+
+def afterFork():
+    pool.afterFork()
+    for service in services:
+        service.afterFork()
+    for store in stores:
+        store.afterFork()
+    # 마스터에서 멈춰 둔 백그라운드 새로 고침은 워커에서 다시 켠다
+    pauseRefresh(False)
+
+def readiness():
+    models = {
+        'catalog': catalogService.model is not None,
+        'mf': mfService.model is not None,
+        'neighbors': neighborService.model is not None,
+        'azti': aztiRecommService.model is not None,
+        'ratings': ratingAggregates.loaded_at > 0,
+        'liked': likedLeaderboard.loaded_at > 0,
+        'curated': curatedService.model is not None,
+    }
+    return all(models.values()), models
+
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+def _warmUp():
+    try:
+        warmUp()
+    except Exception:
+        logger.exception('Model warm-up failed')
+
+def warmUpAsync():
+    # preload 없이 띄웠을 때 (runserver 등) readiness 확인이 들어오면 백그라운드에서 올린다
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is not None and _warmup_thread.is_alive():
+            return False
+        _warmup_thread = threading.Thread(target=_warmUp, daemon=True)
+        _warmup_thread.start()
+    return True
+
+def closeConnections():
+    # fork 전에 마스터의 DB 연결을 닫아 워커들이 같은 소켓을 나눠 쓰지 않게 한다
+    pool.closeAll()
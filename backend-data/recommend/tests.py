@@ -1,3 +1,1076 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import gzip
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipIf
+
+import numpy as np
+import pymysql
+import pandas as pd
+from django.test import RequestFactory, SimpleTestCase
+from scipy.sparse.linalg import svds
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from recommend.recom.azti import AztiIndex, aztiCode
+from recommend.recom.catalog import Catalog
+from recommend.recom.cbfmodel import CbfModel
+from recommend.recom import coldstart
+from recommend.recom.coldstart import AztiRecommendations
+from recommend.recom.database import ConnectionPool, PoolTimeout
+from recommend import asyncviews, views
+from recommend.crawling import geocode, profilefetch
+from recommend.crawling import changeset
+from recommend.crawling.changeset import FingerprintStore
+try:
+    # 크롤러용 셀레니움은 서버 이미지에 없을 수 있다
+    from recommend.crawling import browserpool
+except ImportError:
+    browserpool = None
+from recommend.crawling.licenseindex import LicenseIndex, normalizeName
+from recommend.recom import aggregates, curated, enrich, leaderboard, response, service
+from recommend.recom.features import elements, makeEtc
+from recommend.recom.mfmodel import MfModel
+from recommend.recom.ratingmatrix import RatingMatrix
+from recommend.recom.sampler import RestoSampler
+from recommend.recom.spatial import SpatialIndex, boxRestos, haversine, radiusRestos
+from recommend.recom.tiles import TileCache, coveringTiles, tileCount, tileGeohash, tileOf
+from recommend.recom.neighbors import ItemNeighbors
 
 # Create your tests here.
+
+CSV_PATH = Path(__file__).resolve().parent / 'csvfile' / 'restodata_list.csv'
+
+
+def loopEtc(restos_data):
+    # 기존 views.py / cbf.py 의 행 단위 구현
+    for i in range(len(restos_data)):
+        try:
+            restos_data.loc[i, 'etc'] = restos_data.loc[i, 'etc'].replace(' ' , '').replace(',', ' ')
+        except:
+            restos_data.loc[i, 'etc'] = ''
+
+        for element in elements:
+            if restos_data.loc[i, element] == 'NaN':
+                continue
+            elif restos_data.loc[i, element] >= 1:
+                restos_data.loc[i, 'etc'] += ' ' + element
+    return restos_data
+
+
+class MakeEtcTest(SimpleTestCase):
+    def test_same_as_loop_on_restodata_list(self):
+        restos_data = pd.read_csv(CSV_PATH, encoding='cp949')
+
+        expected = loopEtc(restos_data.copy())['etc'].tolist()
+        result = makeEtc(restos_data.copy())['etc'].tolist()
+
+        self.assertEqual(len(result), len(restos_data))
+        self.assertEqual(result, expected)
+
+    def test_missing_etc_and_elements(self):
+        restos_data = pd.DataFrame({element: [0, 0, 0] for element in elements})
+        restos_data['etc'] = ['노포, 가성비 좋은,', np.nan, None]
+        restos_data['terrace'] = [1, np.nan, 2]
+        restos_data['quiet'] = [0, 3, np.nan]
+
+        expected = loopEtc(restos_data.copy())['etc'].tolist()
+        result = makeEtc(restos_data.copy())['etc'].tolist()
+
+        self.assertEqual(result, ['노포 가성비좋은  terrace', ' quiet', ' terrace'])
+        self.assertEqual(result, expected)
+
+
+def loadRestoData():
+    restos_data = pd.read_csv(CSV_PATH, encoding='cp949')
+    return restos_data.rename(columns={'name': 'resto_name'})
+
+def denseSimilarity(restos_data):
+    # 기존 views.py 의 N x N cosine_similarity
+    restos_data = loopEtc(restos_data.copy())
+    cat_mat = CountVectorizer(min_df=0, ngram_range=(1, 2)).fit_transform(restos_data['etc'])
+    return cosine_similarity(cat_mat, cat_mat)
+
+
+class CbfModelTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.restos_data = loadRestoData()
+        cls.model = CbfModel(cls.restos_data.copy())
+        cls.dense = denseSimilarity(cls.restos_data)
+
+    def assertSameAsDense(self, row, result, top_n=10):
+        # 기존 find_sim_resto: 유사도 열을 붙여 sort_values 후 상위 top_n
+        df = self.restos_data.copy()
+        df['similarity'] = self.dense[row]
+        expected = df.sort_values(by='similarity', ascending=False)[:top_n]
+
+        np.testing.assert_allclose([r['similarity'] for r in result], expected['similarity'].to_numpy(), atol=1e-12)
+        # 동점끼리는 순서가 다를 수 있으므로 각 id 의 유사도가 그 순위의 값과 같은지 본다
+        rows = {resto_id: i for i, resto_id in enumerate(df['id'])}
+        for record in result:
+            self.assertAlmostEqual(self.dense[row, rows[record['id']]], record['similarity'])
+
+    def test_find_by_id_matches_dense_cosine(self):
+        for row in (0, 1, 100, 700, len(self.restos_data) - 1):
+            resto_id = self.restos_data['id'][row]
+            self.assertSameAsDense(row, self.model.findSimRestoById(resto_id))
+            self.assertSameAsDense(row, self.model.findSimRestoById(str(resto_id), 3), 3)
+
+    def test_find_by_name_uses_first_row(self):
+        names = self.restos_data['resto_name']
+        duplicated = names[names.duplicated()].iloc[0]
+        first = names[names == duplicated].index[0]
+        result = self.model.findSimRestoByName(duplicated)
+        self.assertSameAsDense(first, result)
+        with self.assertRaises(KeyError):
+            self.model.findSimRestoByName('없는 노포')
+
+    def test_top_rows_match_dense_top_k(self):
+        for row in (0, 250, 1000):
+            rows, scores = self.model.topRows(row, 10)
+            expected = np.sort(self.dense[row])[::-1][:10]
+            np.testing.assert_allclose(scores, expected, atol=1e-12)
+            np.testing.assert_allclose(self.dense[row, rows], scores, atol=1e-12)
+
+        resto_id = self.restos_data['id'][250]
+        ids, scores = self.model.topK(resto_id, 10)
+        np.testing.assert_allclose(scores, self.model.topRows(250, 10)[1])
+        self.assertEqual(list(ids), list(self.restos_data['id'].to_numpy()[self.model.topRows(250, 10)[0]]))
+
+    def test_top_rows_edge_cases(self):
+        n = len(self.model)
+        rows, scores = self.model.topRows(0, n + 5)
+        self.assertEqual(len(rows), n)
+        self.assertEqual(sorted(rows), list(range(n)))
+        self.assertTrue(np.all(np.diff(scores) <= 0))
+
+        for top_n in (0, -3):
+            rows, scores = self.model.topRows(0, top_n)
+            self.assertEqual((len(rows), len(scores)), (0, 0))
+        self.assertEqual(self.model.findSimRestoById(self.restos_data['id'][0], 0), [])
+        with self.assertRaises(KeyError):
+            self.model.topK(-1)
+
+
+def makeReviewData(seed=0, n=60):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'user_id': [str(u) for u in rng.integers(0, 8, n)],
+        'resto_id': rng.integers(1, 30, n),
+        'rating': rng.integers(1, 6, n).astype(float),
+    })
+
+
+class RatingMatrixTest(SimpleTestCase):
+    def test_matches_pivot_table(self):
+        review_data = makeReviewData()
+        rating_matrix = RatingMatrix(review_data)
+
+        pivot = review_data.pivot_table(index="user_id", columns="resto_id", values="rating").fillna(0)
+        self.assertEqual(list(rating_matrix.user_ids), list(pivot.index))
+        self.assertEqual(list(rating_matrix.resto_ids), list(pivot.columns))
+        np.testing.assert_allclose(rating_matrix.matrix.toarray(), pivot.to_numpy())
+
+    def test_item_similarity_matches_dense_cosine(self):
+        review_data = makeReviewData()
+        resto_ids = list(range(1, 40))
+        rated_ids = sorted(set(resto_ids) & set(review_data['resto_id']))
+        rating_matrix = RatingMatrix(review_data, resto_ids=rated_ids)
+
+        # 기존 makeReviewRestoVector 방식
+        resto_data = pd.DataFrame({'id': resto_ids})
+        merged = pd.merge(review_data, resto_data, left_on="resto_id", right_on="id", how="outer")
+        resto_user_rating = merged.pivot_table('rating', index="id", columns="user_id").fillna(0)
+        dense = pd.DataFrame(cosine_similarity(resto_user_rating), index=resto_user_rating.index, columns=resto_user_rating.index)
+
+        self.assertEqual(list(rating_matrix.resto_ids), list(dense.index))
+        for resto_id in rated_ids:
+            result = rating_matrix.itemSimilarity(resto_id)
+            np.testing.assert_allclose(result.to_numpy(), dense[resto_id].to_numpy(), atol=1e-12)
+        with self.assertRaises(KeyError):
+            rating_matrix.itemSimilarity(35)
+
+
+class ItemNeighborsTest(SimpleTestCase):
+    def test_neighbors_match_sorted_similarity(self):
+        rating_matrix = RatingMatrix(makeReviewData(n=120))
+        table = ItemNeighbors(rating_matrix, k=5, block_size=7)
+
+        for resto_id in rating_matrix.resto_ids:
+            expected = rating_matrix.itemSimilarity(resto_id).drop(resto_id).sort_values(ascending=False)[:5]
+            result = table.neighbors(resto_id)
+            self.assertNotIn(resto_id, result.index)
+            np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-6)
+        with self.assertRaises(KeyError):
+            table.neighbors(1000)
+
+
+class MfModelTest(SimpleTestCase):
+    def test_predict_matches_dense_reconstruction(self):
+        review_data = makeReviewData()
+
+        model = MfModel(review_data, k=2)
+
+        # 기존 getSvdPred 방식으로 전체 예측 행렬 복원
+        matrix = review_data.pivot_table(index="user_id", columns="resto_id", values="rating").fillna(0)
+        user_ratings_mean = np.mean(matrix.to_numpy(), axis=1).reshape(-1, 1)
+        U, sigma, Vt = svds(matrix.to_numpy() - user_ratings_mean, k=2)
+        dense = np.dot(np.dot(U, np.diag(sigma)), Vt) + user_ratings_mean
+        dense = pd.DataFrame(dense, index=matrix.index, columns=matrix.columns)
+
+        for user_id in matrix.index:
+            np.testing.assert_allclose(model.predict(user_id).to_numpy(), dense.loc[user_id].to_numpy())
+        self.assertIsNone(model.predict('unknown'))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise pymysql.err.OperationalError(2006, 'MySQL server has gone away')
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    def test_reuse_and_timeout(self):
+        pool = ConnectionPool(FakeConnection, size=2, timeout=0.05)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(first, second)
+
+        a = pool.acquire()
+        b = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        pool.release(a)
+        pool.release(b)
+
+        stats = pool.stats()
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['in_use'], 0)
+        self.assertEqual(stats['timeouts'], 1)
+
+    def test_broken_connections_are_replaced(self):
+        pool = ConnectionPool(FakeConnection, size=1, timeout=0.05, ping_interval=0)
+
+        with self.assertRaises(pymysql.err.OperationalError):
+            with pool.connection() as broken:
+                raise pymysql.err.OperationalError(2013, 'Lost connection')
+        self.assertTrue(broken.closed)
+
+        with pool.connection() as dead:
+            dead.alive = False
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, dead)
+        self.assertTrue(dead.closed)
+
+        stats = pool.stats()
+        self.assertEqual(stats['discarded'], 1)
+        self.assertEqual(stats['reconnects'], 1)
+        self.assertEqual(stats['created'], 1)
+
+    def test_after_fork_drops_inherited_connections(self):
+        pool = ConnectionPool(FakeConnection, size=2, timeout=0.05)
+        with pool.connection() as inherited:
+            pass
+        held = pool.acquire()
+        pool._cond.acquire()
+
+        pool.afterFork()
+        # 부모와 같이 쓰는 소켓은 닫지 않고, 부모가 잡고 있던 잠금도 물려받지 않는다
+        self.assertFalse(inherited.closed)
+        with pool.connection() as fresh:
+            self.assertIsNot(fresh, inherited)
+            self.assertIsNot(fresh, held)
+        self.assertEqual(pool.stats()['created'], 1)
+
+
+class EnrichRestosTest(SimpleTestCase):
+    def test_one_query_per_kind(self):
+        ratings = {1: 4.5, 3: 2.0}
+        reviews = [
+            {'id': 10, 'content': 'a', 'rating': 5, 'resto_id': 1, 'user_id': 'u1', 'nickname': 'n1', 'profile_image': None},
+            {'id': 11, 'content': 'b', 'rating': 4, 'resto_id': 1, 'user_id': 'u2', 'nickname': 'n2', 'profile_image': None},
+        ]
+        restoList = [{'id': 1}, {'id': 2}, {'id': 3}, {'id': 1}]
+
+        with mock.patch.object(enrich.ratingAggregates, 'ratings', return_value=ratings) as rating_lookup, \
+                mock.patch.object(enrich, 'selectRestoReviews', return_value=reviews) as review_query:
+            enrich.enrichRestos(restoList, review=True)
+
+        rating_lookup.assert_called_once_with([1, 2, 3])
+        review_query.assert_called_once_with([1, 2, 3])
+        self.assertEqual([item['rating'] for item in restoList], [4.5, None, 2.0, 4.5])
+        self.assertEqual([len(item['review']) for item in restoList], [2, 0, 0, 2])
+
+
+class FakeWatermarkTable:
+    # review / liked 처럼 id 가 늘어나는 테이블. count() 와 after() 가 selectXCount / selectXAfter 자리에 들어간다
+    def __init__(self):
+        self.rows = []
+        self.queries = []
+
+    def add(self, resto_id, **fields):
+        row_id = self.rows[-1]['id'] + 1 if self.rows else 1
+        self.rows.append({'id': row_id, 'resto_id': resto_id, **fields})
+
+    def count(self):
+        return [{'cnt': len(self.rows), 'max_id': self.rows[-1]['id'] if self.rows else None}]
+
+    def after(self, rowId, maxId):
+        self.queries.append((rowId, maxId))
+        return [row for row in self.rows if rowId < row['id'] <= maxId]
+
+
+class RatingAggregatesTest(SimpleTestCase):
+    def setUp(self):
+        self.table = FakeWatermarkTable()
+        patcher = mock.patch.multiple(aggregates, selectReviewCount=self.table.count, selectReviewsAfter=self.table.after)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_incremental_refresh(self):
+        self.table.add(1, rating=4.0)
+        self.table.add(1, rating=5.0)
+        self.table.add(2, rating=3.0)
+
+        store = aggregates.RatingAggregates()
+        store.reload()
+        self.assertEqual(store.ratings([1, 2, 3]), {1: 4.5, 2: 3.0})
+
+        self.table.add(2, rating=5.0)
+        self.table.add(3, rating=1.0)
+        store.refresh()
+
+        self.assertEqual(self.table.queries[-1], (3, 5))
+        self.assertEqual(store.get(2), (2, 8.0))
+        self.assertEqual(store.rating(3), 1.0)
+        self.assertIsNone(store.rating(4))
+
+    def test_delete_triggers_full_reload(self):
+        for rating in (1.0, 2.0, 3.0):
+            self.table.add(1, rating=rating)
+
+        store = aggregates.RatingAggregates()
+        store.reload()
+        del self.table.rows[0]
+        store.refresh()
+
+        self.assertEqual(self.table.queries[-1], (0, 3))
+        self.assertEqual(store.get(1), (2, 5.0))
+
+
+def makeCatalogRows():
+    return [
+        {'id': 1, 'resto_name': 'a', 'grade': 'TEN', 'ele_id': 11, 'element.id': 11, 'terrace': 1, 'drinking': 0},
+        {'id': 2, 'resto_name': 'b', 'grade': 'THIRTY', 'ele_id': 12, 'element.id': 12, 'terrace': 0, 'drinking': 3},
+        {'id': 3, 'resto_name': 'c', 'grade': 'TEN', 'ele_id': None, 'element.id': None, 'terrace': None, 'drinking': None},
+    ]
+
+
+class CatalogTest(SimpleTestCase):
+    def setUp(self):
+        self.catalog = Catalog(makeCatalogRows(), ['id', 'resto_name', 'grade', 'ele_id'], version=(3, 3))
+
+    def test_by_ids_keeps_request_order(self):
+        result = self.catalog.byIds((3, 1, 99, 3))
+        self.assertEqual(result, [
+            {'id': 3, 'resto_name': 'c', 'grade': 'TEN', 'ele_id': None},
+            {'id': 1, 'resto_name': 'a', 'grade': 'TEN', 'ele_id': 11},
+        ])
+        self.assertEqual(self.catalog.byId(2, joined=True), makeCatalogRows()[1])
+        self.assertIsNone(self.catalog.byId(99))
+
+    def test_rows_are_fresh_dicts(self):
+        self.catalog.byId(1)['rating'] = 5
+        self.assertNotIn('rating', self.catalog.byId(1))
+
+    def test_numeric_arrays(self):
+        np.testing.assert_array_equal(self.catalog.array('terrace') > 0, [True, False, False])
+        self.assertEqual(list(self.catalog.frame(['id', 'resto_name'])['resto_name']), ['a', 'b', 'c'])
+
+
+class AztiIndexTest(SimpleTestCase):
+    def test_buckets_match_sql_filter(self):
+        rows = []
+        for i, (terrace, cost_effective, real_local, drinking) in enumerate([(1, 2, 0, 3), (0, 1, 0, 0), (2, 0, 0, 1), (None, 1, 1, 1), (0, 1, 0, 0)]):
+            rows.append({'id': i + 1, 'resto_name': str(i), 'terrace': terrace, 'cost_effective': cost_effective, 'real_local': real_local, 'drinking': drinking})
+        index = AztiIndex(Catalog(rows, ['id', 'resto_name']))
+
+        self.assertEqual(aztiCode('mcis'), 0b1101)
+        self.assertEqual(list(index.codes), [0b1101, 0b0100, 0b1001, -1, 0b0100])
+        self.assertEqual(list(index.rows('mcis')), [0])
+        self.assertEqual(list(index.rows('dcic')), [1, 4])
+        self.assertEqual(list(index.rows('mnis')), [2])
+        # 해당 유형이 없으면 야외좌석 있는 노포
+        self.assertEqual(list(index.rows('dnhs')), [0, 2])
+        self.assertEqual(list(index.rows('xxxx')), [0, 2])
+
+
+class FakeCbfModel:
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.calls = 0
+
+    def findSimRestoByName(self, title, top_n):
+        self.calls += 1
+        return self.catalog.all()[:top_n]
+
+
+class FakeNeighborTable:
+    trained_at = 1
+
+    def neighbors(self, restoId):
+        return pd.Series([0.9, 0.5], index=pd.Index([3, 2], name='id'))
+
+
+class AztiRecommendationsTest(SimpleTestCase):
+    def test_lists_are_precomputed_and_copied(self):
+        rows = [{'id': i, 'resto_name': str(i), 'terrace': 1, 'cost_effective': 1, 'real_local': 0, 'drinking': 1} for i in range(1, 4)]
+        catalog = Catalog(rows, ['id', 'resto_name'], version=(3,))
+        cbf_model = FakeCbfModel(catalog)
+        recomm = AztiRecommendations(catalog, cbf_model, FakeNeighborTable())
+
+        self.assertEqual(cbf_model.calls, 16)
+        self.assertEqual(recomm.version, ((3,), 1))
+        result = recomm.get('mcis')
+        self.assertEqual([item['id'] for item in result], [1, 2, 3, 3, 2])
+        result[0]['rating'] = 5
+        self.assertNotIn('rating', recomm.get('mcis')[0])
+        self.assertEqual([item['id'] for item in recomm.getCbf('mcis')], [1, 2, 3])
+        self.assertEqual(cbf_model.calls, 16)
+
+    def test_without_neighbor_table(self):
+        rows = [{'id': 1, 'resto_name': '1', 'terrace': 1, 'cost_effective': 1, 'real_local': 0, 'drinking': 1}]
+        catalog = Catalog(rows, ['id', 'resto_name'])
+        recomm = AztiRecommendations(catalog, FakeCbfModel(catalog), None)
+
+        self.assertEqual(recomm.version, (None, None))
+        self.assertEqual([item['id'] for item in recomm.get('dnhc')], [1])
+
+    def test_service_rebuilds_from_one_catalog(self):
+        rows = [{'id': 1, 'resto_name': '1', 'terrace': 1, 'cost_effective': 1, 'real_local': 0, 'drinking': 1}]
+        old_catalog = Catalog(rows, ['id', 'resto_name'], version=1)
+        new_catalog = Catalog(rows, ['id', 'resto_name'], version=2)
+        table = FakeNeighborTable()
+        recomm_service = coldstart.AztiRecommService('test', coldstart.buildAztiRecommendations)
+
+        with mock.patch.object(coldstart.catalogService, 'model', old_catalog), \
+                mock.patch.object(coldstart.neighborService, 'model', table), \
+                mock.patch.object(coldstart, 'getCatalog', return_value=old_catalog), \
+                mock.patch.object(coldstart.neighborService, 'getModel', return_value=table), \
+                mock.patch.object(coldstart, 'getCbfModel', side_effect=FakeCbfModel) as get_cbf_model:
+            recomm_service.train()
+            self.assertFalse(recomm_service.needsTraining())
+            get_cbf_model.assert_called_once_with(old_catalog)
+
+            # 노포 목록이 바뀌면 다시 만들어야 하고, 만들 때 읽은 목록이 키가 된다
+            coldstart.catalogService.model = new_catalog
+            self.assertTrue(recomm_service.needsTraining())
+            coldstart.getCatalog.return_value = new_catalog
+            recomm_service.train()
+            self.assertEqual(recomm_service.model.version, (2, 1))
+            get_cbf_model.assert_called_with(new_catalog)
+            self.assertFalse(recomm_service.needsTraining())
+
+
+def makeLocationCatalog():
+    rng = np.random.default_rng(0)
+    lng = 126.9 + rng.random(300) * 0.3
+    lat = 37.45 + rng.random(300) * 0.2
+    rows = [{'id': i + 1, 'location_x': x, 'location_y': y} for i, (x, y) in enumerate(zip(lng, lat))]
+    rows.append({'id': 301, 'location_x': None, 'location_y': None})
+    return Catalog(rows, ['id', 'location_x', 'location_y'], version=1), lng, lat
+
+
+def sqlBox(lng, lat, locx, locy, size=0.054):
+    # 기존 /resto/location SQL 의 위경도 사각형 (경계 제외)
+    inside = (lng > locx - size) & (lng < locx + size) & (lat > locy - size) & (lat < locy + size)
+    return list(np.flatnonzero(inside))
+
+
+class SpatialIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.catalog, self.lng, self.lat = makeLocationCatalog()
+        self.index = SpatialIndex(self.catalog)
+        self.dist = haversine(37.55, 127.0, self.lat, self.lng)
+
+    def test_nearest_and_radius_match_brute_force(self):
+        self.assertEqual(len(self.index), 300)
+        rows, dist = self.index.nearest(127.0, 37.55, 10)
+        self.assertEqual(list(rows), list(np.argsort(self.dist)[:10]))
+        np.testing.assert_allclose(dist, np.sort(self.dist)[:10])
+
+        rows, dist = self.index.radius(127.0, 37.55, 3)
+        expected = np.argsort(self.dist)[:np.count_nonzero(self.dist <= 3)]
+        self.assertEqual(list(rows), list(expected))
+
+    def test_box_matches_sql_filter(self):
+        with mock.patch('recommend.recom.spatial.tileCache', TileCache()):
+            rows, dist = boxRestos(self.catalog, self.index, 127.0, 37.55)
+        self.assertEqual(sorted(rows), sqlBox(self.lng, self.lat, 127.0, 37.55))
+        self.assertTrue(np.all(np.diff(dist) >= 0))
+
+
+class TileCacheTest(SimpleTestCase):
+    def test_geohash(self):
+        self.assertEqual(tileGeohash(tileOf(10.40744, 57.64911)), 'u4pru')
+        self.assertEqual(tileGeohash(tileOf(10.40744, 57.64911, 11), 11), 'u4pruydqqvj')
+
+    def test_lru_ttl_and_version(self):
+        cache = TileCache(maxsize=2, ttl=60)
+        builds = []
+        build = lambda key: lambda: builds.append(key) or key
+        for key in ['a', 'b', 'a', 'c', 'b']:
+            cache.get(1, key, build(key))
+        # b 는 c 가 들어올 때 밀려났다
+        self.assertEqual(builds, ['a', 'b', 'c', 'b'])
+        cache.get(2, 'b', build('b'))
+        self.assertEqual(builds, ['a', 'b', 'c', 'b', 'b'])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+        cache.ttl = 0
+        cache.get(2, 'b', build('b'))
+        self.assertEqual(len(builds), 6)
+
+    def test_tiles_match_index(self):
+        catalog, lng, lat = makeLocationCatalog()
+        index = SpatialIndex(catalog)
+        with mock.patch('recommend.recom.spatial.tileCache', TileCache()) as cache:
+            for locx, locy in [(127.0, 37.55), (127.01, 37.56), (126.95, 37.5)]:
+                rows, dist = boxRestos(catalog, index, locx, locy)
+                self.assertEqual(sorted(rows), sqlBox(lng, lat, locx, locy))
+                self.assertTrue(np.all(np.diff(dist) >= 0))
+
+                rows, dist = radiusRestos(catalog, index, locx, locy, 2.5)
+                expected_rows, expected_dist = index.radius(locx, locy, 2.5)
+                self.assertEqual(sorted(rows), sorted(expected_rows))
+            self.assertGreater(cache.stats()['hits'], 0)
+
+    def test_large_radius_skips_tiles(self):
+        catalog, _, _ = makeLocationCatalog()
+        index = SpatialIndex(catalog)
+        self.assertEqual(tileCount(126.5, 127.5, 37.0, 38.0), len(coveringTiles(126.5, 127.5, 37.0, 38.0)))
+        with mock.patch('recommend.recom.spatial.tileCache', TileCache()) as cache:
+            for radius in (50, 500, float('inf')):
+                rows, dist = radiusRestos(catalog, index, 127.0, 37.55, radius)
+                self.assertEqual(sorted(rows), list(range(300)))
+                self.assertTrue(np.all(np.diff(dist) >= 0))
+            # 타일은 하나도 만들지 않았다
+            self.assertEqual(cache.stats()['misses'], 0)
+            self.assertEqual(len(radiusRestos(catalog, index, 127.0, 37.55, float('nan'))[0]), 0)
+
+
+class RestoSamplerTest(SimpleTestCase):
+    def setUp(self):
+        rows = [{'id': i + 1, 'grade': 'THIRTY' if i % 3 == 0 else 'FIFTY'} for i in range(30)]
+        self.sampler = RestoSampler(Catalog(rows, ['id', 'grade']))
+
+    def test_sample_by_grade(self):
+        rows = self.sampler.sample(5, 'THIRTY')
+        self.assertEqual(len(set(rows)), 5)
+        self.assertTrue(all(row % 3 == 0 for row in rows))
+        # 뽑을 수 있는 것보다 많이 요청하면 전부
+        self.assertEqual(sorted(self.sampler.sample(50, 'THIRTY')), list(range(0, 30, 3)))
+        self.assertEqual(len(self.sampler.sample(2)), 2)
+        self.assertEqual(len(self.sampler.sample(2, 'HUNDRED')), 0)
+
+    def test_seed_is_reproducible(self):
+        self.assertEqual(list(self.sampler.sample(5, seed=7)), list(self.sampler.sample(5, seed=7)))
+        self.assertEqual(list(self.sampler.sample(5, seed='7')), list(self.sampler.sample(5, seed='7')))
+
+
+class CuratedCollectionsTest(SimpleTestCase):
+    def test_payloads_are_prebuilt_json(self):
+        ids = sorted(curated.developerIds + curated.youtuberIds + (5, 6))
+        catalog = Catalog([{'id': i, 'resto_name': str(i), 'grade': 'THIRTY'} for i in ids], ['id', 'resto_name'])
+
+        def fakeEnrich(restoList, review=False):
+            for item in restoList:
+                item['rating'] = 4.0
+                item['review'] = []
+            return restoList
+
+        with mock.patch.object(curated, 'enrichRestos', side_effect=fakeEnrich) as enrich_call:
+            collections = curated.CuratedCollections(catalog, [6, 5], [5], version=1)
+
+        enrich_call.assert_called_once()
+        dev = json.loads(collections.payload('devList').body)['devList']
+        self.assertEqual([item['id'] for item in dev], sorted(curated.developerIds))
+        self.assertEqual(dev[0]['grade'], 'THIRTY')
+        like = json.loads(collections.payload('likeList').body)['likeList']
+        self.assertEqual([item['id'] for item in like], [6, 5])
+        self.assertEqual(like[0], {'id': 6, 'resto_name': '6', 'rating': 4.0, 'review': []})
+        self.assertIsInstance(collections.payload('youList').body, bytes)
+        self.assertEqual([item['id'] for item in json.loads(collections.payload('trendList').body)['trendList']], [5])
+
+    def test_rebuild_sees_like_behind_new_version(self):
+        catalog = Catalog([{'id': i, 'resto_name': str(i)} for i in (5, 6, 7)], ['id', 'resto_name'], version=1)
+        table = FakeWatermarkTable()
+        table.add(5)
+        board = leaderboard.LikedLeaderboard(check_interval=10 ** 9)
+        version = [(1, 1, 0, None)]
+
+        with mock.patch.multiple(leaderboard, selectLikedCount=table.count, selectLikedAfter=table.after), \
+                mock.patch.multiple(curated, likedLeaderboard=board, ratingAggregates=mock.DEFAULT, getCatalog=mock.DEFAULT,
+                                    selectCollectionVersion=mock.DEFAULT, enrichRestos=mock.DEFAULT) as patched:
+            patched['getCatalog'].return_value = catalog
+            patched['selectCollectionVersion'].side_effect = lambda: version[0]
+            board.reload()
+            service = curated.CuratedService('test', curated.buildCuratedCollections)
+            service.train()
+            self.assertFalse(service.needsTraining())
+
+            # 좋아요가 들어와 버전은 바뀌었지만 순위표의 백그라운드 갱신은 아직 돌지 않은 상태
+            table.add(7)
+            table.add(7)
+            version[0] = (3, 3, 0, None)
+            self.assertTrue(service.needsTraining())
+            service.train()
+
+        like = json.loads(service.model.payload('likeList').body)['likeList']
+        self.assertEqual([item['id'] for item in like], [7, 5])
+        self.assertEqual(service.model.version, ((3, 3, 0, None), 1))
+        patched['ratingAggregates'].refresh.assert_called()
+
+
+class LikedLeaderboardTest(SimpleTestCase):
+    def setUp(self):
+        self.table = FakeWatermarkTable()
+        patcher = mock.patch.multiple(leaderboard, selectLikedCount=self.table.count, selectLikedAfter=self.table.after)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_incremental_top_and_trending(self):
+        now = [1000.0]
+        patcher = mock.patch.object(leaderboard.time, 'time', side_effect=lambda: now[0])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        for restoId in (1, 1, 1, 2, 2, 3):
+            self.table.add(restoId)
+        board = leaderboard.LikedLeaderboard(half_life=100, check_interval=10 ** 9)
+        board.reload()
+        self.assertEqual(board.top(2), [(1, 3), (2, 2)])
+
+        # 한 반감기 뒤에 들어온 좋아요 2개는 예전 좋아요 4개만큼 센다
+        self.table.add(3)
+        self.table.add(3)
+        now[0] = 1100.0
+        board.refresh()
+        self.assertEqual(self.table.queries[-1], (6, 8))
+        self.assertEqual(board.top(3), [(1, 3), (3, 3), (2, 2)])
+        trending = board.trending(3)
+        self.assertEqual([restoId for restoId, _ in trending], [3, 1, 2])
+        self.assertAlmostEqual(trending[0][1], 2.5)
+        self.assertAlmostEqual(trending[1][1], 1.5)
+
+    def test_unlike_triggers_full_reload(self):
+        for restoId in (1, 1, 2):
+            self.table.add(restoId)
+        board = leaderboard.LikedLeaderboard()
+        board.reload()
+        del self.table.rows[0]
+        board.refresh()
+
+        self.assertEqual(self.table.queries[-1], (0, 3))
+        self.assertEqual(board.top(), [(1, 1), (2, 1)])
+
+
+class JsonResponseTest(SimpleTestCase):
+    data = {'list': [{'id': np.int64(1), 'avg(rating)': Decimal('4.50'), 'score': np.float32(0.5), 'regdate': datetime.datetime(2022, 10, 1, 12, 30), 'name': '노포'}]}
+    expected = {'list': [{'id': 1, 'avg(rating)': 4.5, 'score': 0.5, 'regdate': '2022-10-01T12:30:00', 'name': '노포'}]}
+
+    def test_dumps_db_and_numpy_values(self):
+        self.assertEqual(json.loads(response.dumps(self.data)), self.expected)
+        with mock.patch.object(response, 'orjson', None):
+            self.assertEqual(json.loads(response.dumps(self.data)), self.expected)
+
+    def test_gzip_only_large_payloads(self):
+        factory = RequestFactory()
+        small = response.jsonResponse(self.data, factory.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertFalse(small.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(small.content), self.expected)
+
+        payload = response.JsonPayload(response.dumps({'list': self.data['list'] * 200}))
+        large = response.payloadResponse(payload, factory.get('/', HTTP_ACCEPT_ENCODING='gzip, deflate'))
+        self.assertEqual(large['Content-Encoding'], 'gzip')
+        self.assertEqual(large['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(large.content), payload.body)
+        self.assertIs(payload.encoded('gzip'), payload.encoded('gzip'))
+
+        plain = response.payloadResponse(payload, factory.get('/', HTTP_ACCEPT_ENCODING='gzip;q=0'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+
+class AsyncViewsTest(SimpleTestCase):
+    def slow(self, value):
+        def fetch(*args, **kwargs):
+            time.sleep(0.2)
+            return value() if callable(value) else value
+        return fetch
+
+    def test_resto_list_fetches_concurrently(self):
+        with mock.patch.multiple(
+                asyncviews,
+                likedCount=self.slow(3),
+                mfRestos=self.slow(lambda: [{'id': 10}, {'id': 11}]),
+                CbfList=self.slow(lambda: [{'id': i} for i in range(1, 9)]),
+                randomRestos=self.slow(lambda: [{'id': 100}, {'id': 101}])), \
+                mock.patch('recommend.views.enrichRestos') as enrich_call:
+            start = time.time()
+            result = asyncio.run(asyncviews.restoList(RequestFactory().get('/'), 'u1', 'mcis'))
+            elapsed = time.time() - start
+
+        self.assertLess(elapsed, 0.6)
+        enrich_call.assert_called_once()
+        self.assertEqual([item['id'] for item in json.loads(result.content)['recomList']], [100, 101, 1, 2, 3, 4, 5, 10, 11])
+
+    def test_method_check_and_csrf_exempt(self):
+        self.assertTrue(asyncio.iscoroutinefunction(asyncviews.locationList))
+        self.assertTrue(asyncviews.locationList.csrf_exempt)
+        result = asyncio.run(asyncviews.locationList(RequestFactory().get('/')))
+        self.assertEqual(result.status_code, 405)
+
+
+class WarmUpTest(SimpleTestCase):
+    def test_no_refresh_threads_while_paused_or_fresh(self):
+        model_service = service.ModelService('test', object, check_interval=60)
+        model_service.train()
+        # 방금 만든 모델은 check_interval 동안 새로 고치지 않는다
+        self.assertFalse(model_service.refreshAsync())
+
+        self.addCleanup(service.pauseRefresh, False)
+        service.pauseRefresh()
+        with mock.patch.object(service.threading, 'Thread') as thread:
+            self.assertFalse(model_service.refreshAsync(force=True))
+            store = aggregates.RatingAggregates(check_interval=0)
+            store.loaded_at = 1
+            self.assertFalse(store.refreshAsync())
+        thread.assert_not_called()
+
+        service.pauseRefresh(False)
+        with mock.patch.object(service.threading, 'Thread') as thread:
+            self.assertTrue(model_service.refreshAsync(force=True))
+        thread.assert_called_once()
+
+
+class ReadyCheckTest(SimpleTestCase):
+    def test_not_ready_starts_warm_up(self):
+        models = {'catalog': True, 'mf': False}
+        with mock.patch.object(views, 'readiness', return_value=(False, models)), \
+                mock.patch.object(views, 'warmUpAsync') as warm_up:
+            result = asyncio.run(asyncviews.readyList(RequestFactory().get('/')))
+        warm_up.assert_called_once()
+        self.assertEqual(result.status_code, 503)
+        self.assertEqual(json.loads(result.content), {'ready': False, 'models': models})
+
+        with mock.patch.object(views, 'readiness', return_value=(True, {'catalog': True})), \
+                mock.patch.object(views, 'warmUpAsync') as warm_up:
+            data, status = views.readyCheck()
+        warm_up.assert_not_called()
+        self.assertEqual(status, 200)
+
+
+class ProfileStubHandler(BaseHTTPRequestHandler):
+    # 저장해 둔 profile.php 를 돌려주는 로컬 서버. rid=flaky 는 처음 한 번 503, ETag 가 맞으면 304
+    fixture = (Path(__file__).resolve().parent / 'crawling' / 'fixtures' / 'diningcode_profile.html').read_bytes()
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        rid = self.path.split('rid=')[-1]
+        if rid == 'missing' or (rid == 'flaky' and self.paths.count(self.path) == 1):
+            self.send_response(404 if rid == 'missing' else 503)
+            self.end_headers()
+            return
+        etag = '"%s"' % rid
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(self.fixture)))
+        self.end_headers()
+        self.wfile.write(self.fixture)
+
+    def log_message(self, *args):
+        pass
+
+
+class ProfileFetcherTest(SimpleTestCase):
+    def setUp(self):
+        ProfileStubHandler.paths = []
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), ProfileStubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.url = 'http://127.0.0.1:%d/profile.php?rid={rid}' % self.server.server_address[1]
+
+    def test_parse_fixture(self):
+        profile = profilefetch.parseProfile(ProfileStubHandler.fixture.decode('utf-8'))
+        self.assertEqual(profile['name'], '을지면옥')
+        self.assertEqual(profile['star'], 24)
+        self.assertEqual(profile['tags'], {'점심식사': 12, '가성비좋은': 7, '지역주민이찾는': 5, '평양냉면': 9})
+        self.assertEqual(list(profile['menus']), ['물냉면', '편육'])
+        self.assertEqual(profile['address'], '서울특별시 중구 충무로14길 2-1')
+        self.assertIsNone(profilefetch.parseProfile('<html></html>'))
+
+    def test_fetch_all_with_retry(self):
+        fetcher = profilefetch.ProfileFetcher(self.url, max_workers=4, rate=0, backoff=0.01, parse_workers=2)
+        result = list(fetcher.fetchAll(['1', 'flaky', 'missing', '2']))
+
+        self.assertEqual([rid for rid, _ in result], ['1', 'flaky', 'missing', '2'])
+        self.assertEqual([profile['name'] if profile else None for _, profile in result], ['을지면옥', '을지면옥', None, '을지면옥'])
+        self.assertEqual(ProfileStubHandler.paths.count('/profile.php?rid=flaky'), 2)
+        self.assertEqual(ProfileStubHandler.paths.count('/profile.php?rid=missing'), 1)
+
+    def test_conditional_requests(self):
+        fetcher = profilefetch.ProfileFetcher(self.url, rate=0, parse_workers=0)
+        list(fetcher.fetchAll(['1', '2']))
+        self.assertEqual(fetcher.validators, {'1': ('"1"', None), '2': ('"2"', None)})
+
+        # 지난번 ETag 를 보내면 304, 바뀐 페이지(ETag 불일치)는 다시 파싱
+        result = dict(fetcher.fetchAll(['1', '2'], {'1': ('"1"', None), '2': ('"old"', None)}))
+        self.assertIs(result['1'], profilefetch.NOT_MODIFIED)
+        self.assertEqual(result['2']['name'], '을지면옥')
+
+    def test_rate_limit_per_host(self):
+        limiter = profilefetch.HostRateLimiter(20)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait(self.url)
+        limiter.wait('http://other.example/')
+        self.assertGreaterEqual(time.monotonic() - start, 0.19)
+        self.assertLess(time.monotonic() - start, 0.4)
+
+
+def licenseRow(date, address, name, sectors):
+    row = [''] * 12
+    row[0], row[4], row[7], row[11] = date, address, name, sectors
+    return row
+
+
+class LicenseIndexTest(SimpleTestCase):
+    def setUp(self):
+        self.index = LicenseIndex([
+            licenseRow('19850301', '서울특별시 중구 입정동 177', '을지면옥', '한식'),
+            licenseRow('19920101', '서울특별시 마포구 도화동 1', '을지면옥', '냉면집'),
+            licenseRow('19700505', '서울특별시 종로구 관철동 1', '(주)우래옥 본점', '한식'),
+            ['짧은', '행'],
+        ])
+
+    def test_exact_match_prefers_same_district(self):
+        self.assertEqual(self.index.lookup('을지면옥', '서울특별시 중구 충무로14길 2-1'), ('1985', '한식'))
+        # 구를 모르면 파일의 마지막 행 (기존 스캔과 같음)
+        self.assertEqual(self.index.lookup('을지면옥'), ('1992', '냉면집'))
+
+    def test_normalized_match(self):
+        self.assertEqual(normalizeName('(주) 우래옥 본점'), '우래옥본점')
+        self.assertEqual(self.index.lookup('우래옥 본점', '서울 종로구 관철동'), ('1970', '한식'))
+        self.assertEqual(self.index.lookup('ＵＲＡＥＯＫ'), None)
+        self.assertEqual(len(self.index), 2)
+
+
+class FakeGeocodeBackend:
+    def __init__(self, coordinates, fail=()):
+        self.coordinates = coordinates
+        self.fail = set(fail)
+        self.calls = []
+
+    def geocode(self, address):
+        self.calls.append(address)
+        if address in self.fail:
+            raise ConnectionError(address)
+        return self.coordinates.get(address)
+
+
+class GeocoderTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = str(Path(directory.name) / 'geocode.sqlite3')
+
+    def makeGeocoder(self, backend):
+        cache = geocode.GeocodeCache(self.path)
+        self.addCleanup(cache.close)
+        return geocode.Geocoder(backend, cache)
+
+    def test_cache_survives_runs(self):
+        backend = FakeGeocodeBackend({'서울 중구 충무로14길 2-1': ('37.56', '126.99')}, fail=['서울 종로구 1'])
+        result = self.makeGeocoder(backend).resolveMany(['서울  중구 충무로14길 2-1', '서울 중구 충무로14길 2-1', '없는 주소', '서울 종로구 1', ''])
+
+        self.assertEqual(result['서울 중구 충무로14길 2-1'], {'lat': '37.56', 'lng': '126.99'})
+        self.assertEqual(result['서울  중구 충무로14길 2-1'], {'lat': '37.56', 'lng': '126.99'})
+        self.assertEqual(result['없는 주소'], geocode.NOT_FOUND)
+        self.assertEqual(result[''], geocode.NOT_FOUND)
+        self.assertEqual(sorted(backend.calls), sorted(['서울 중구 충무로14길 2-1', '없는 주소', '서울 종로구 1']))
+
+        # 다시 돌리면 통신 오류였던 주소만 물어본다 (못 찾은 주소도 저장됨)
+        backend = FakeGeocodeBackend({'서울 종로구 1': ('37.57', '126.98')})
+        geocoder = self.makeGeocoder(backend)
+        result = geocoder.resolveMany(['서울 중구 충무로14길 2-1', '없는 주소', '서울 종로구 1'])
+        self.assertEqual(backend.calls, ['서울 종로구 1'])
+        self.assertEqual(result['서울 종로구 1'], {'lat': '37.57', 'lng': '126.98'})
+        self.assertEqual(geocoder.hits, 2)
+
+    def test_negative_results_expire(self):
+        backend = FakeGeocodeBackend({})
+        self.makeGeocoder(backend).resolve('없는 주소')
+        geocoder = self.makeGeocoder(backend)
+        geocoder.cache.negative_ttl = 0
+        geocoder.resolve('없는 주소')
+        self.assertEqual(backend.calls, ['없는 주소', '없는 주소'])
+
+    def test_kakao_key_is_required(self):
+        with mock.patch.dict(os.environ, {}, clear=True):
+            with self.assertRaisesMessage(RuntimeError, 'KAKAO_REST_API_KEY'):
+                geocode.KakaoGeocoder()
+        with mock.patch.dict(os.environ, {'KAKAO_REST_API_KEY': 'key'}):
+            self.assertEqual(geocode.KakaoGeocoder(session=object()).api_key, 'key')
+
+
+class FingerprintStoreTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = FingerprintStore(str(Path(directory.name) / 'crawl_state.sqlite3'))
+        self.addCleanup(self.store.close)
+
+    def crawl(self, records, unchanged=(), validators=None, complete=True, cached=(), source='diningcode'):
+        changes, digests = self.store.diff(source, records, unchanged, complete)
+        self.store.commit(source, changes, digests, validators, records, cached)
+        return changes
+
+    def test_changeset(self):
+        changes = self.crawl({'1': {'name': '을지면옥'}, '2': {'name': '우래옥'}, '3': {'name': '이문설농탕'}}, validators={'1': ('"1"', None)})
+        self.assertEqual([c['source_id'] for c in changes['inserted']], ['1', '2', '3'])
+        self.assertEqual(self.store.validators('diningcode'), {'1': ('"1"', None)})
+
+        # 1 은 304, 2 는 내용이 바뀜, 3 은 사라짐, 4 는 새로 생김
+        changes = self.crawl({'2': {'name': '우래옥 본점'}, '4': {'name': '필동면옥'}}, unchanged=['1'])
+        self.assertEqual(changes['inserted'], [{'source_id': '4', 'record': {'name': '필동면옥'}}])
+        self.assertEqual(changes['updated'], [{'source_id': '2', 'record': {'name': '우래옥 본점'}}])
+        self.assertEqual(changes['deleted'], ['3'])
+        self.assertEqual(sorted(self.store.fingerprints('diningcode')), ['1', '2', '4'])
+
+        # 같은 내용이면 (키 순서가 달라도) 바뀐 것이 없다
+        changes = self.crawl({'2': {'name': '우래옥 본점'}, '4': {'name': '필동면옥'}, '1': {'name': '을지면옥'}})
+        self.assertEqual((changes['inserted'], changes['updated'], changes['deleted']), ([], [], []))
+
+        # 일부만 크롤링했으면 삭제로 보지 않는다
+        changes = self.crawl({'4': {'name': '필동면옥'}}, complete=False)
+        self.assertEqual(changes['deleted'], [])
+
+    def test_fresh_ids_are_skipped_until_recheck(self):
+        self.crawl({'1': {'name': '을지면옥'}, '2': {'name': '우래옥'}})
+        self.assertEqual(self.store.fresh('diningcode'), {'1', '2'})
+        self.assertEqual(self.store.fresh('youtube'), set())
+
+        # 건너뛴 id 는 unchanged 로 넘기면 삭제되지 않고, 받은 시각도 그대로라 RECHECK_AFTER 가 지나면 다시 받는다
+        changes = self.crawl({'2': {'name': '우래옥'}}, unchanged=['1'])
+        self.assertEqual(changes['deleted'], [])
+        with mock.patch.object(changeset.time, 'time', return_value=time.time() + changeset.RECHECK_AFTER + 1):
+            self.assertEqual(self.store.fresh('diningcode'), set())
+
+    def test_cached_pages_keep_fetch_time(self):
+        self.crawl({'v1': {'title': '을지면옥', 'etc': '냉면,'}}, source='youtube')
+        self.assertEqual(self.store.records('youtube'), {'v1': {'title': '을지면옥', 'etc': '냉면,'}})
+
+        # watch 페이지는 건너뛰고 태그는 지난 값으로 채워도, 제목이 바뀐 것은 잡힌다
+        later = time.time() + changeset.RECHECK_AFTER / 2
+        with mock.patch.object(changeset.time, 'time', return_value=later):
+            etc = self.store.records('youtube')['v1']['etc']
+            changes = self.crawl({'v1': {'title': '을지면옥 본점', 'etc': etc}}, cached=['v1'], source='youtube')
+        self.assertEqual(changes['updated'], [{'source_id': 'v1', 'record': {'title': '을지면옥 본점', 'etc': '냉면,'}}])
+        self.assertEqual(self.store.records('youtube')['v1']['title'], '을지면옥 본점')
+        # 받은 시각은 처음 받은 그대로라 RECHECK_AFTER 가 지나면 페이지를 다시 받는다
+        with mock.patch.object(changeset.time, 'time', return_value=time.time() + changeset.RECHECK_AFTER + 1):
+            self.assertEqual(self.store.fresh('youtube'), set())
+
+
+class FakeBrowser:
+    # find_elements 를 부를 때마다 목록이 step 개씩 늘어나는 가짜 드라이버 (max_items 에서 멈춤)
+    def __init__(self, max_items=0, step=3, broken=False):
+        self.items = 0
+        self.max_items = max_items
+        self.step = step
+        self.broken = broken
+        self.advanced = 0
+        self.quit_called = False
+
+    def find_elements(self, by, selector):
+        return list(range(self.items))
+
+    def advance(self, driver):
+        self.advanced += 1
+        self.items = min(self.items + self.step, self.max_items)
+        return self.items < self.max_items or None
+
+    def quit(self):
+        self.quit_called = True
+
+
+@skipIf(browserpool is None, 'selenium is not installed')
+class BrowserPoolTest(SimpleTestCase):
+    def test_load_all_stops_when_list_stops_growing(self):
+        driver = FakeBrowser(max_items=7)
+        driver.items = 1
+        items = browserpool.loadAll(driver, 'li', driver.advance, timeout=0.5, grow_timeout=0.2)
+        self.assertEqual(len(items), 7)
+        # 1 -> 4 -> 7, 마지막 한 번은 늘지 않아서 끝
+        self.assertEqual(driver.advanced, 3)
+        self.assertEqual(browserpool.loadAll(FakeBrowser(), 'li', driver.advance, timeout=0.2), [])
+        with self.assertRaises(browserpool.TimeoutException):
+            browserpool.loadAll(FakeBrowser(), 'li', driver.advance, timeout=0.2, required=True)
+
+    def test_pool_reuses_and_replaces_drivers(self):
+        created = []
+
+        def factory():
+            created.append(FakeBrowser())
+            return created[-1]
+
+        def task(driver, item):
+            if item == 'crash' and not any(driver.broken for driver in created):
+                driver.broken = True
+                raise browserpool.WebDriverException('crashed')
+            return item * 2
+
+        with browserpool.BrowserPool(max_workers=2, factory=factory) as pool:
+            self.assertEqual(pool.map(task, [1, 2, 3, 4, 5]), [2, 4, 6, 8, 10])
+            self.assertLessEqual(len(created), 2)
+            self.assertEqual(pool.map(task, ['crash']), ['crashcrash'])
+        # 죽은 드라이버는 버리고 새로 만든다
+        self.assertEqual(sum(driver.broken for driver in created), 1)
+        self.assertTrue(all(driver.quit_called for driver in created))
+
+    def test_map_can_skip_failed_items(self):
+        def task(driver, item):
+            if item == 'down':
+                raise browserpool.TimeoutException('no list')
+            return item * 2
+
+        with browserpool.BrowserPool(max_workers=2, factory=FakeBrowser) as pool:
+            with self.assertLogs(browserpool.logger, 'ERROR'):
+                self.assertEqual(pool.map(task, [1, 'down', 3], skip_failed=True), [2, None, 6])
+            with self.assertLogs(browserpool.logger, 'WARNING'), self.assertRaises(browserpool.TimeoutException):
+                pool.map(task, ['down'])
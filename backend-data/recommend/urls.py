@@ -1,6 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ASGI 로 띄울 때는 같은 주소에 async 뷰를 연결한다
+if settings.RECOMMEND_ASYNC_VIEWS:
+    from . import asyncviews as views
+
 app_name = 'recommend'
 
 urlpatterns = [
@@ -12,5 +17,7 @@ urlpatterns = [
     path('resto/youtuber', views.youtuberList),
     path('resto/thirty', views.thirtyList),
     path('resto/liked', views.likedList),
-    path('resto/location', views.locationList)
+    path('resto/trending', views.trendingList),
+    path('resto/location', views.locationList),
+    path('ready', views.readyList),
 ]
@@ -1,208 +1,37 @@
-from django.shortcuts import HttpResponse
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
-import pandas as pd
-
-import warnings
-
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-
-from recommend.recom.knn import selectOldAllRestaurant 
 from recommend.recom.knn import *
+from recommend.recom.catalog import getCatalog
+from recommend.recom.azti import aztiRestos
+from recommend.recom.cbfmodel import getCbfModel
+from recommend.recom.coldstart import getAztiRecommendations
+from recommend.recom.curated import curatedPayload
+from recommend.recom.mfmodel import mfRecomm
+from recommend.recom.neighbors import getItemBasedCF
+from recommend.recom.sampler import randomRestos
+from recommend.recom.spatial import locationRestos
+from recommend.recom.enrich import enrichRestos
+from recommend.recom.response import jsonResponse, payloadResponse
+from recommend.recom.warmup import readiness, warmUpAsync
 
 import random
-import json
 # Create your views here.
 
 def restoAzti(aztitype):
-    aztiList = ['mcis', 'dcis', 'mnis', 'dnis', 'mchs', 'dchs','mnhs', 'dnhs', 'mchc', 'dchc', 'mnhc', 'dnhc', 'mcic', 'dcic', 'mnic', 'dnic']
-    text = ''
-    if aztitype in aztiList:
-        if aztitype[0] == 'm':
-            text += 'terrace > 0'
-        else:
-            text += 'terrace = 0'
-
-        if aztitype[1] == 'c':
-            text += ' and cost_effective > 0'
-        else:
-            text += ' and cost_effective = 0'
-
-        if aztitype[2] == 'h':
-            text += ' and real_local > 0'
-        else:
-            text += ' and real_local = 0'
-
-        if aztitype[3] == 's':
-            text += ' and drinking > 0'
-        else:
-            text += ' and drinking = 0'
-    
-    result = aztiRestaurants(text)
-    if len(result) == 0:
-        text = 'terrace > 0'
-        result = aztiRestaurants(text)
-    return result
+    return aztiRestos(aztitype)
 
 def CbfList(aztiType):
-    warnings.filterwarnings('ignore')
-
-    elements = ['terrace', 'drinking', 'meal', 'lunch', 'dinner', 'cost_effective', 'classy', 'mood', 'noisy', 'quiet', 'real_local']
-    restos_data = selectOldAllRestaurant()
-    for i in range(len(restos_data)):
-        try:
-            restos_data.loc[i, 'etc'] = restos_data.loc[i, 'etc'].replace(' ' , '').replace(',', ' ')
-        except:
-            restos_data.loc[i, 'etc'] = ''
-
-        for element in elements:
-            if restos_data.loc[i, element] == 'NaN':
-                continue
-            elif restos_data.loc[i, element] >= 1:
-                restos_data.loc[i, 'etc'] += ' ' + element
-
-    count_vect = CountVectorizer(min_df=0, ngram_range=(1, 2))
-    cat_mat = count_vect.fit_transform(restos_data['etc'])
-
-    cat_sim = cosine_similarity(cat_mat, cat_mat)
-
-    def find_sim_resto(df, sim_matrix, title_name, top_n=10):
-        
-        # 입력한 영화의 index
-        title_movie = df[df['resto_name'] == title_name]
-        title_index = title_movie.index.values
-        
-        # 입력한 영화의 유사도 데이터 프레임 추가
-        df["similarity"] = sim_matrix[title_index, :].reshape(-1,1)
-        
-        # 유사도 내림차순 정렬 후 상위 index 추출
-        temp = df.sort_values(by="similarity", ascending=False)
-        final_index = temp.index.values[ : top_n]
-        
-        return df.iloc[final_index]
-
-    azti_result = restoAzti(aztiType)
-    request_title = azti_result[0]['resto_name']
-    request_num = 10
-
-    similar_restos = find_sim_resto(restos_data, cat_sim, request_title, request_num)
-
-    result_cbf = similar_restos.to_dict(orient='records')
-    restoId = result_cbf[0]['id']
-
-    result = getItemBasedCF(restoId)
-    id_list = tuple(result.index.values)
-    result_cf = IdOldRestaurant(id_list)
-    
-    data = result_cbf + result_cf
-    return data
+    return getAztiRecommendations().get(aztiType)
 
 def misList(restoId):
-    warnings.filterwarnings('ignore')
-
-    elements = ['terrace', 'drinking', 'meal', 'lunch', 'dinner', 'cost_effective', 'classy', 'mood', 'noisy', 'quiet', 'real_local']
-    restos_data = selectOldAllRestaurant()
-    for i in range(len(restos_data)):
-        try:
-            restos_data.loc[i, 'etc'] = restos_data.loc[i, 'etc'].replace(' ' , '').replace(',', ' ')
-        except:
-            restos_data.loc[i, 'etc'] = ''
-
-        for element in elements:
-            if restos_data.loc[i, element] == 'NaN':
-                continue
-            elif restos_data.loc[i, element] >= 1:
-                restos_data.loc[i, 'etc'] += ' ' + element
-
-    count_vect = CountVectorizer(min_df=0, ngram_range=(1, 2))
-    cat_mat = count_vect.fit_transform(restos_data['etc'])
-
-    cat_sim = cosine_similarity(cat_mat, cat_mat)
-
-    def find_sim_resto(df, sim_matrix, title_name, top_n=10):
-        # 입력한 영화의 index
-        title_movie = df[df['resto_name'] == title_name]
-        title_index = title_movie.index.values
-
-        if len(title_index) > 1:
-            title_index = title_index[0]
-
-        # 입력한 영화의 유사도 데이터 프레임 추가
-        df["similarity"] = sim_matrix[title_index, :].reshape(-1,1)
-        
-        # 유사도 내림차순 정렬 후 상위 index 추출
-        temp = df.sort_values(by="similarity", ascending=False)
-        final_index = temp.index.values[ : top_n]
-        
-        return df.iloc[final_index]
-    
-    request_title = selectOneRestaurant(restoId)[0]['resto_name']
     request_num = 10
 
-    similar_restos = find_sim_resto(restos_data, cat_sim, request_title, request_num)
-
-    result = similar_restos.to_dict(orient='records')
+    result = getCbfModel().findSimRestoById(restoId, request_num)
 
     return result
 
-@api_view(["GET"])
-def recommCbfList(request, aztiType):
-    warnings.filterwarnings('ignore')
-
-    if request.method == 'GET':
-        elements = ['terrace', 'drinking', 'meal', 'lunch', 'dinner', 'cost_effective', 'classy', 'mood', 'noisy', 'quiet', 'real_local']
-        restos_data = selectOldAllRestaurant()
-        for i in range(len(restos_data)):
-            try:
-                restos_data.loc[i, 'etc'] = restos_data.loc[i, 'etc'].replace(' ' , '').replace(',', ' ')
-            except:
-                restos_data.loc[i, 'etc'] = ''
-
-            for element in elements:
-                if restos_data.loc[i, element] == 'NaN':
-                    continue
-                elif restos_data.loc[i, element] >= 1:
-                    restos_data.loc[i, 'etc'] += ' ' + element
-
-        count_vect = CountVectorizer(min_df=0, ngram_range=(1, 2))
-        cat_mat = count_vect.fit_transform(restos_data['etc'])
-
-        cat_sim = cosine_similarity(cat_mat, cat_mat)
-
-        def find_sim_resto(df, sim_matrix, title_name, top_n=10):
-            # 입력한 영화의 index
-            title_movie = df[df['resto_name'] == title_name]
-            title_index = title_movie.index.values
-
-            if len(title_index) > 1:
-                title_index = title_index[0]
-
-            # 입력한 영화의 유사도 데이터 프레임 추가
-            df["similarity"] = sim_matrix[title_index, :].reshape(-1,1)
-            
-            # 유사도 내림차순 정렬 후 상위 index 추출
-            temp = df.sort_values(by="similarity", ascending=False)
-            final_index = temp.index.values[ : top_n]
-            
-            return df.iloc[final_index]
-
-        azti_result = restoAzti(aztiType)
-        request_title = azti_result[0]['resto_name']
-        request_num = 10
-
-        similar_restos = find_sim_resto(restos_data, cat_sim, request_title, request_num)
-
-        result = similar_restos.to_dict(orient='records')
-
-        data = {
-            'recommendCbfList': result,
-        }
-        return HttpResponse(json.dumps(data), content_type='application/json')
-
-@api_view(['GET'])
-def recommCfList(request, restoId):
+def cfRecomm(restoId):
     try:
         result = getItemBasedCF(restoId)
         id_list = tuple(result.index.values)
@@ -214,41 +43,20 @@ def recommCfList(request, restoId):
         
         id_list = tuple(id_list)
     
-    cfList = IdOldRestaurant(id_list)
+    cfList = getCatalog().byIds(id_list)
     
-    for cfItem in cfList:
-        try:
-            rating = selectRestoRating(cfItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
-
-        cfItem['rating'] = rating
+    enrichRestos(cfList)
+    return cfList
 
-    data = {
-        'recommendCfList': cfList
-    }
-    return HttpResponse(json.dumps(data), content_type='application/json')
-
-@api_view(['GET'])
-def recommMfList(request, userId):
+def mfRestos(userId):
     result = mfRecomm(userId)
     id_List = tuple(result.values)
-    data = {
-        'recommendMfList' : IdOldRestaurant(id_List)
-    }
-    return HttpResponse(json.dumps(data), content_type='application/json')
-
-@api_view(['GET'])
-def restoList(request, userId, aztiType):
-    liked_num = selectLiked(userId)[0]['COUNT(*)']
+    return getCatalog().byIds(id_List)
 
-    result = mfRecomm(userId)
-    id_List = tuple(result.values)
-    
-    result_mf = IdOldRestaurant(id_List)
-    result_cbf = CbfList(aztiType)
-    result_random = OldRestaurantRandom()
+def likedCount(userId):
+    return selectLiked(userId)[0]['COUNT(*)']
 
+def mixRestoList(liked_num, result_cbf, result_mf, result_random):
     answer = result_random
     if liked_num == 0:
         answer += result_cbf[:8]
@@ -269,125 +77,118 @@ def restoList(request, userId, aztiType):
         answer += result_cbf[:1]
         answer += result_mf[:7]
 
-    for ansItem in answer:
-        try:
-            rating = selectRestoRating(ansItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
+    enrichRestos(answer)
+    return answer
 
-        ansItem['rating'] = rating
+def thirtyRestos(seed=None):
+    thirList = randomRestos(20, grade='THIRTY', seed=seed, joined=True)
+    enrichRestos(thirList, review=True)
+    return thirList
 
-    data = {
-        'recomList': answer
+def locationQuery(params):
+    locx = params.get('location_x')
+    locy = params.get('location_y')
+    locx = float(locx)
+    locy = float(locy)
+    # 선택: k(가까운 k개), radius(km), page(0부터), size
+    k = params.get('k')
+    radius = params.get('radius')
+    page = params.get('page')
+    size = params.get('size')
+    locList, total = locationRestos(
+        locx, locy,
+        k=None if k is None else int(k),
+        radius=None if radius is None else float(radius),
+        page=None if page is None else int(page),
+        size=None if size is None else int(size),
+    )
+    return {
+        'locList' : locList,
+        'total' : total,
     }
 
-    return HttpResponse(json.dumps(data), content_type='application/json')
+def readyCheck():
+    ready, models = readiness()
+    if not ready:
+        warmUpAsync()
+    return {'ready': ready, 'models': models}, 200 if ready else 503
 
+@api_view(["GET"])
+def recommCbfList(request, aztiType):
+    if request.method == 'GET':
+        result = getAztiRecommendations().getCbf(aztiType)
 
-@api_view(['GET'])
-def developerList(request):
-    devList = selectDeveloper()
-    for devItem in devList:
-        try:
-            rating = selectRestoRating(devItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
-        
-        try:
-            reviews = selectRestoReview(devItem['id'])
-        except:
-            reviews = []
+        data = {
+            'recommendCbfList': result,
+        }
+        return jsonResponse(data, request)
 
-        devItem['rating'] = rating
-        devItem['review'] = reviews
-    
+@api_view(['GET'])
+def recommCfList(request, restoId):
     data = {
-        'devList' : devList
+        'recommendCfList': cfRecomm(restoId)
     }
-    return HttpResponse(json.dumps(data), content_type='application/json')
+    return jsonResponse(data, request)
 
 @api_view(['GET'])
-def youtuberList(request):
-    youList = selectYoutuber()
-    for youItem in youList:
-        try:
-            rating = selectRestoRating(youItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
-        
-        try:
-            reviews = selectRestoReview(youItem['id'])
-        except:
-            reviews = []
-
-        youItem['rating'] = rating
-        youItem['review'] = reviews
-    
+def recommMfList(request, userId):
     data = {
-        'youList': youList
+        'recommendMfList' : mfRestos(userId)
     }
-    return HttpResponse(json.dumps(data), content_type='application/json')
+    return jsonResponse(data, request)
 
 @api_view(['GET'])
-def thirtyList(request):
-    thirList = selectThirtyNopo()
-    for thirItem in thirList:
-        try:
-            rating = selectRestoRating(thirItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
-        
-        try:
-            reviews = selectRestoReview(thirItem['id'])
-        except:
-            reviews = []
+def restoList(request, userId, aztiType):
+    liked_num = likedCount(userId)
+
+    # 좋아요가 없는 사용자는 미리 만들어 둔 AZTI 유형별 목록만 쓴다
+    result_mf = []
+    if liked_num > 0:
+        result_mf = mfRestos(userId)
+    result_cbf = CbfList(aztiType)
+    result_random = randomRestos(2, seed=request.GET.get('seed'))
+
+    answer = mixRestoList(liked_num, result_cbf, result_mf, result_random)
 
-        thirItem['rating'] = rating
-        thirItem['review'] = reviews
-    
     data = {
-        'thirList': thirList
+        'recomList': answer
     }
-    return HttpResponse(json.dumps(data), content_type='application/json')
 
-@api_view(['GET'])
-def likedList(request):
-    likeList = selectLikedNopo()
-    restoList = []
+    return jsonResponse(data, request)
 
-    for likeItem in likeList:
-        restoList.append(likeItem['resto_id'])
 
-    likeList = IdOldRestaurant(tuple(restoList))
+@api_view(['GET'])
+def developerList(request):
+    return payloadResponse(curatedPayload('devList'), request)
 
-    for likeItem in likeList:
-        try:
-            rating = selectRestoRating(likeItem['id'])[0]['avg(rating)']
-        except:
-            rating = 0
-        
-        try:
-            reviews = selectRestoReview(likeItem['id'])
-        except:
-            reviews = []
+@api_view(['GET'])
+def youtuberList(request):
+    return payloadResponse(curatedPayload('youList'), request)
 
-        likeItem['rating'] = rating
-        likeItem['review'] = reviews
-    
+@api_view(['GET'])
+def thirtyList(request):
     data = {
-        'likeList': likeList
+        'thirList': thirtyRestos(request.GET.get('seed'))
     }
-    return HttpResponse(json.dumps(data), content_type='application/json')
+    return jsonResponse(data, request)
+
+@api_view(['GET'])
+def likedList(request):
+    return payloadResponse(curatedPayload('likeList'), request)
+
+@api_view(['GET'])
+def trendingList(request):
+    # 최근 1주 반감기로 감쇠한 좋아요 순
+    return payloadResponse(curatedPayload('trendList'), request)
 
 
 @api_view(['POST'])
 def locationList(request):
-    locx = request.data.get('location_x')
-    locy = request.data.get('location_y')
-    locx = float(locx)
-    locy = float(locy)
-    locList = selectLocationResto(locx, locy)
-    data = {
-        'locList' : locList
-    }
-    return HttpResponse(json.dumps(data), content_type='application/json')
\ No newline at end of file
+    return jsonResponse(locationQuery(request.data), request)
+
+
+@api_view(['GET'])
+def readyList(request):
+    # 모델이 전부 메모리에 올라왔을 때만 200
+    data, status = readyCheck()
+    return jsonResponse(data, request, status)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -78,6 +79,23 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "wherehouse.wsgi.application"
 
+# 운영 서버 (gunicorn.conf.py 에서 읽는다)
+SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:8000')
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', 2))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 4))
+# 1 이면 uvicorn 워커로 ASGI 앱을 띄운다
+SERVER_ASGI = os.environ.get('SERVER_ASGI', '0') == '1'
+SERVER_TIMEOUT = int(os.environ.get('SERVER_TIMEOUT', 120))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT', 30))
+SERVER_MAX_REQUESTS = int(os.environ.get('SERVER_MAX_REQUESTS', 0))
+# 마스터에서 모델을 미리 올리고 fork (워커끼리 copy-on-write 로 공유)
+SERVER_PRELOAD = os.environ.get('SERVER_PRELOAD', '1') == '1'
+# 이 파일의 수정 시각이 바뀌면 모델을 다시 올리고 워커를 차례로 교체한다 (SIGHUP 과 같음)
+SERVER_RELOAD_FILE = os.environ.get('SERVER_RELOAD_FILE', '')
+
+# 추천 API 를 async 뷰로 (uvicorn 등 ASGI 서버에서)
+RECOMMEND_ASYNC_VIEWS = os.environ.get('RECOMMEND_ASYNC_VIEWS', '1' if SERVER_ASGI else '0') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/4.1/ref/settings/#databases